@@ -7,6 +7,7 @@ from functools import partial
 import telebot
 
 from anker.bot import message_processing
+from anker.card_generation import translation_service
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +86,7 @@ def main():
         expected_users_ids = ()
     else:
         expected_users_ids = tuple(map(int, expected_users_ids_raw.split(",")))
+    translation_service.start_translation_workers()
     start_bot(bot_token=bot_token, expected_users_ids=expected_users_ids)
 
 
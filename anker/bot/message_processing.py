@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import dataclasses
 import email.utils
 import json
 import logging
+import time
 import typing as _t
 
 import telebot
 
 from anker import anki_api
 from anker.bot.client_state import ClientState, ClientStates
-from anker.card_generation import translation
+from anker.card_generation import translation, translation_service
 from anker.types import UserInfo
 from anker.bot import sticker_storage
 
@@ -17,6 +19,8 @@ logger = logging.getLogger(__name__)
 
 
 GET_DECKS_BATCH_SIZE = 10
+# Telegram limits how often a message may be edited
+LONG_TEXT_EDIT_INTERVAL_SECONDS = 1.0
 
 
 def process_new_message(bot: telebot.TeleBot, message: telebot.types.Message):
@@ -175,6 +179,8 @@ def _process_select_language(
         return
 
     logger.info(msg={"comment": "languages are selected", "user_id": user_id})
+    # Start loading translation models before the first word arrives
+    translation_service.prefetch_language_pair(client_state.language_from, lang)
     new_client_state = client_state.make_from(
         language_to=lang, state=ClientStates.AUTHORIZED
     )
@@ -271,16 +277,89 @@ def _process_new_word(
     possible_word = message.text.strip()
     if not _check_state_is_ready_to_add_a_card(bot, message, client_state):
         return
+    if len(possible_word) > translation.get_max_input_chars():
+        bot.reply_to(
+            message,
+            f"The text is too long, please send at most "
+            f"{translation.get_max_input_chars()} characters",
+        )
+        return
+    if translation.is_long_text(possible_word):
+        _process_long_text(bot, message, client_state, possible_word)
+        return
 
-    translation_result = translation.get_translations(
+    part_of_speech = None
+    sent_translations: set[str] = set()
+    for translation_result in translation_service.iterate_translations(
         from_language=client_state.language_from,
         to_language=client_state.language_to,
         input_text=possible_word,
-    )
-    if translation_result is None or len(translation_result.possible_translations) == 0:
+    ):
+        # Candidates of faster backends are sent right away, the slower ones
+        # reuse a part of speech found earlier
+        part_of_speech = translation_result.part_of_speech or part_of_speech
+        translation_result = dataclasses.replace(
+            translation_result,
+            possible_translations=tuple(
+                t
+                for t in translation_result.possible_translations
+                if t not in sent_translations
+            ),
+            part_of_speech=part_of_speech,
+        )
+        sent_translations.update(translation_result.possible_translations)
+        _send_translations(bot, message, possible_word, translation_result)
+
+    if len(sent_translations) == 0:
         bot.reply_to(message, f"Can't translate {possible_word}")
-        return
 
+
+def _process_long_text(
+    bot: telebot.TeleBot,
+    message: telebot.types.Message,
+    client_state: ClientState,
+    text: str,
+):
+    logger.info(msg={"comment": "process a long text", "length": len(text)})
+    # The reply is edited while sentences are translated
+    reply = bot.reply_to(message, "Translating…")
+    shown_text = ""
+    last_edit_time = 0.0
+    translated_text = ""
+    for translated_text in translation_service.iterate_long_text_translation(
+        from_language=client_state.language_from,
+        to_language=client_state.language_to,
+        input_text=text,
+    ):
+        if time.monotonic() - last_edit_time < LONG_TEXT_EDIT_INTERVAL_SECONDS:
+            continue
+        shown_text = _edit_long_text_reply(bot, reply, shown_text, translated_text)
+        last_edit_time = time.monotonic()
+    _edit_long_text_reply(
+        bot, reply, shown_text, translated_text or "Can't translate the text"
+    )
+
+
+def _edit_long_text_reply(
+    bot: telebot.TeleBot,
+    reply: telebot.types.Message,
+    shown_text: str,
+    new_text: str,
+) -> str:
+    # Telegram rejects edits which do not change the text
+    if new_text != shown_text:
+        bot.edit_message_text(
+            new_text, chat_id=reply.chat.id, message_id=reply.message_id
+        )
+    return new_text
+
+
+def _send_translations(
+    bot: telebot.TeleBot,
+    message: telebot.types.Message,
+    possible_word: str,
+    translation_result: translation.TranslationResult,
+):
     for translation_text in translation.format_translation_result_iterator(
         translation_result
     ):
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import os
+import pathlib
+import threading
+import typing as _t
+
+import argostranslate.package
+import ctranslate2
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class CTranslate2Settings:
+    # e.g. "int8", "int8_float32" or "auto" for the fastest supported one
+    compute_type: str
+    # batches translated at the same time
+    inter_threads: int
+    # threads used for a single batch
+    intra_threads: int
+    beam_size: int
+    max_batch_size: int
+
+
+class ArgosBatchTranslator:
+    # Runs the CTranslate2 model of an Argos package directly, so many texts
+    # are translated by a single `translate_batch` call instead of one
+    # `translate` call each
+    def __init__(
+        self, package: argostranslate.package.Package, settings: CTranslate2Settings
+    ):
+        self._tokenizer = package.tokenizer
+        self._target_prefix: str = getattr(package, "target_prefix", "")
+        self._model_path = pathlib.Path(package.package_path) / "model"
+        self._settings = settings
+        self._translator: _t.Optional[ctranslate2.Translator] = None
+        self._translator_pid: _t.Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _get_translator(self) -> ctranslate2.Translator:
+        # A translator starts its worker threads when it is created and
+        # forked processes don't get them, so every process creates its own
+        # translator on first use
+        with self._lock:
+            if self._translator is None or self._translator_pid != os.getpid():
+                logger.info(
+                    msg={"comment": "load argos model", "path": str(self._model_path)}
+                )
+                self._translator = ctranslate2.Translator(
+                    str(self._model_path),
+                    device="cpu",
+                    compute_type=self._settings.compute_type,
+                    inter_threads=self._settings.inter_threads,
+                    intra_threads=self._settings.intra_threads,
+                )
+                self._translator_pid = os.getpid()
+            return self._translator
+
+    def load(self) -> None:
+        self._get_translator()
+
+    def translate_batch(self, texts: _t.Sequence[str]) -> list[str]:
+        if not texts:
+            return []
+        results = self._get_translator().translate_batch(
+            [self._tokenizer.encode(text) for text in texts],
+            target_prefix=(
+                [[self._target_prefix]] * len(texts) if self._target_prefix else None
+            ),
+            beam_size=self._settings.beam_size,
+            max_batch_size=self._settings.max_batch_size,
+            replace_unknowns=True,
+        )
+        translations = []
+        for result in results:
+            tokens = result.hypotheses[0]
+            if self._target_prefix:
+                tokens = tokens[1:]
+            translations.append(self._tokenizer.decode(tokens).lstrip())
+        return translations
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import collections
+import enum
+import logging
+import threading
+import typing as _t
+import unicodedata
+
+from anker.types import BaseAnkerException
+
+logger = logging.getLogger(__name__)
+
+
+class BackendRouterException(BaseAnkerException):
+    pass
+
+
+@enum.unique
+class InputKind(enum.Enum):
+    KNOWN_WORD = "known_word"
+    UNKNOWN_WORD = "unknown_word"
+    KNOWN_PHRASE = "known_phrase"
+    PHRASE = "phrase"
+    FOREIGN_SCRIPT = "foreign_script"
+
+
+RoutesT = _t.Mapping[InputKind, tuple[str, ...]]
+
+
+def get_script(text: str) -> _t.Optional[str]:
+    # The script most of the letters are written in, e.g. "LATIN" or "CYRILLIC"
+    scripts = collections.Counter(
+        unicodedata.name(char, "UNKNOWN").split(" ", 1)[0]
+        for char in text
+        if char.isalpha()
+    )
+    if not scripts:
+        return None
+    ((script, _),) = scripts.most_common(1)
+    return script
+
+
+def classify(
+    text: str,
+    expected_script: _t.Optional[str],
+    is_in_dictionary: _t.Callable[[str], bool],
+) -> InputKind:
+    script = get_script(text)
+    if expected_script is not None and script not in (None, expected_script):
+        return InputKind.FOREIGN_SCRIPT
+    is_known = is_in_dictionary(text)
+    if len(text.split()) > 1:
+        return InputKind.KNOWN_PHRASE if is_known else InputKind.PHRASE
+    return InputKind.KNOWN_WORD if is_known else InputKind.UNKNOWN_WORD
+
+
+def parse_routes(
+    raw_routes: str, backends: tuple[str, ...]
+) -> dict[InputKind, tuple[str, ...]]:
+    # Format: "known_word=wordnet;phrase=argos,mariam"
+    routes = {}
+    for raw_route in filter(None, map(str.strip, raw_routes.split(";"))):
+        raw_kind, _, raw_backends = raw_route.partition("=")
+        try:
+            kind = InputKind(raw_kind.strip())
+        except ValueError as ex:
+            raise BackendRouterException(f"unknown input kind: {raw_route}") from ex
+        route = tuple(filter(None, map(str.strip, raw_backends.split(","))))
+        unknown_backends = set(route) - set(backends)
+        if not route or unknown_backends:
+            raise BackendRouterException(f"invalid backends: {raw_route}")
+        routes[kind] = route
+    return routes
+
+
+class BackendRouter:
+    # Picks the cheapest set of backends which is enough for the input and
+    # counts decisions, so the routes can be tuned
+    def __init__(self, routes: RoutesT):
+        missing_kinds = set(InputKind) - set(routes)
+        assert not missing_kinds, missing_kinds
+        self._routes = dict(routes)
+        self._lock = threading.Lock()
+        self._decisions: collections.Counter[InputKind] = collections.Counter()
+
+    def route(
+        self,
+        text: str,
+        expected_script: _t.Optional[str],
+        is_in_dictionary: _t.Callable[[str], bool],
+    ) -> tuple[str, ...]:
+        kind = classify(text, expected_script, is_in_dictionary)
+        with self._lock:
+            self._decisions[kind] += 1
+        logger.debug(
+            msg={
+                "comment": "route a translation",
+                "kind": kind.value,
+                "backends": self._routes[kind],
+            }
+        )
+        return self._routes[kind]
+
+    def get_statistics(self) -> dict[InputKind, int]:
+        with self._lock:
+            return {kind: self._decisions[kind] for kind in InputKind}
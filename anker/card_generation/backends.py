@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import logging
+import threading
+import time
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+T = _t.TypeVar("T")
+
+
+@dataclasses.dataclass
+class BackendStatistics:
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def average_seconds(self) -> float:
+        if self.calls == 0:
+            return 0.0
+        return self.total_seconds / self.calls
+
+
+class BackendRunner:
+    # Runs translation backends concurrently, every one with its own deadline.
+    # Backends which missed a deadline keep running in the background, so their
+    # timings are still accounted, but their results are dropped.
+    def __init__(self, max_workers: int):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="translation-backend"
+        )
+        self._statistics: dict[str, BackendStatistics] = {}
+        self._lock = threading.Lock()
+
+    def get_statistics(self) -> dict[str, BackendStatistics]:
+        with self._lock:
+            return {
+                name: dataclasses.replace(statistics)
+                for name, statistics in self._statistics.items()
+            }
+
+    def _get_or_create_statistics(self, name: str) -> BackendStatistics:
+        # expects the lock to be held
+        return self._statistics.setdefault(name, BackendStatistics())
+
+    def _call(self, name: str, function: _t.Callable[[], T]) -> T:
+        started_at = time.monotonic()
+        try:
+            return function()
+        except Exception:
+            with self._lock:
+                self._get_or_create_statistics(name).failures += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started_at
+            with self._lock:
+                statistics = self._get_or_create_statistics(name)
+                statistics.calls += 1
+                statistics.total_seconds += elapsed
+                statistics.max_seconds = max(statistics.max_seconds, elapsed)
+
+    def iterate(
+        self,
+        functions: _t.Mapping[str, _t.Callable[[], T]],
+        deadlines: _t.Mapping[str, float],
+    ) -> _t.Iterator[tuple[str, T]]:
+        started_at = time.monotonic()
+        names = {
+            self._executor.submit(self._call, name, function): name
+            for name, function in functions.items()
+        }
+        pending = set(names)
+        while pending:
+            now = time.monotonic()
+            expired = {
+                future
+                for future in pending
+                if not future.done() and started_at + deadlines[names[future]] <= now
+            }
+            for future in expired:
+                with self._lock:
+                    self._get_or_create_statistics(names[future]).timeouts += 1
+                logger.warning(
+                    msg={
+                        "comment": "backend missed its deadline",
+                        "backend": names[future],
+                    }
+                )
+            pending -= expired
+            if not pending:
+                break
+            timeout = min(started_at + deadlines[names[f]] for f in pending) - now
+            timeout = max(timeout, 0.0)
+            done, pending = concurrent.futures.wait(
+                pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                try:
+                    yield names[future], future.result()
+                except Exception:
+                    logger.exception(
+                        msg={"comment": "backend has failed", "backend": names[future]}
+                    )
+
+    def run(
+        self,
+        functions: _t.Mapping[str, _t.Callable[[], T]],
+        deadlines: _t.Mapping[str, float],
+    ) -> dict[str, T]:
+        return dict(self.iterate(functions, deadlines))
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import dataclasses
+import logging
+import queue
+import threading
+import time
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+KeyT = _t.TypeVar("KeyT", bound=_t.Hashable)
+InputT = _t.TypeVar("InputT")
+OutputT = _t.TypeVar("OutputT")
+
+
+@dataclasses.dataclass(frozen=True)
+class _BatchItem(_t.Generic[InputT, OutputT]):
+    value: InputT
+    future: concurrent.futures.Future[OutputT]
+
+
+class MicroBatcher(_t.Generic[KeyT, InputT, OutputT]):
+    # Every key gets its own queue and worker thread, so batches never mix keys.
+    def __init__(
+        self,
+        batch_function: _t.Callable[[KeyT, tuple[InputT, ...]], _t.Sequence[OutputT]],
+        max_batch_size: int,
+        max_wait_seconds: float,
+    ):
+        assert max_batch_size > 0, max_batch_size
+        assert max_wait_seconds >= 0, max_wait_seconds
+        self._batch_function = batch_function
+        self._max_batch_size = max_batch_size
+        self._max_wait_seconds = max_wait_seconds
+        self._queues: dict[KeyT, queue.SimpleQueue[_BatchItem[InputT, OutputT]]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: KeyT, value: InputT) -> concurrent.futures.Future[OutputT]:
+        future: concurrent.futures.Future[OutputT] = concurrent.futures.Future()
+        self._get_queue(key).put(_BatchItem(value, future))
+        return future
+
+    def __call__(self, key: KeyT, value: InputT) -> OutputT:
+        return self.submit(key, value).result()
+
+    def _get_queue(self, key: KeyT) -> queue.SimpleQueue[_BatchItem[InputT, OutputT]]:
+        with self._lock:
+            if key not in self._queues:
+                self._queues[key] = queue.SimpleQueue()
+                threading.Thread(
+                    target=self._run_worker,
+                    args=(key, self._queues[key]),
+                    name=f"micro-batcher-{key}",
+                    daemon=True,
+                ).start()
+            return self._queues[key]
+
+    def _collect_batch(
+        self, items: queue.SimpleQueue[_BatchItem[InputT, OutputT]]
+    ) -> list[_BatchItem[InputT, OutputT]]:
+        batch = [items.get()]
+        deadline = time.monotonic() + self._max_wait_seconds
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout <= 0:
+                    batch.append(items.get_nowait())
+                else:
+                    batch.append(items.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_worker(
+        self, key: KeyT, items: queue.SimpleQueue[_BatchItem[InputT, OutputT]]
+    ):
+        while True:
+            batch = self._collect_batch(items)
+            logger.debug(
+                msg={"comment": "run a batch", "key": key, "batch_size": len(batch)}
+            )
+            try:
+                results = self._batch_function(key, tuple(item.value for item in batch))
+                assert len(results) == len(batch), (len(results), len(batch))
+            except Exception as ex:
+                for item in batch:
+                    item.future.set_exception(ex)
+                continue
+            for item, result in zip(batch, results):
+                item.future.set_result(result)
+
+
+def map_ordered(
+    function: _t.Callable[[InputT], OutputT],
+    values: _t.Iterable[InputT],
+    max_workers: int,
+    max_pending: int,
+) -> _t.Iterator[OutputT]:
+    # Like `Executor.map`, but values are read lazily: at most `max_pending`
+    # values are in flight, so memory stays bounded for endless inputs.
+    # Results are yielded in the order of values.
+    assert max_workers > 0, max_workers
+    assert max_pending >= max_workers, (max_pending, max_workers)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: collections.deque[
+            concurrent.futures.Future[OutputT]
+        ] = collections.deque()
+        for value in values:
+            pending.append(executor.submit(function, value))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import enum
+import fileinput
+import json
+import logging
+import os
+import sys
+import time
+import typing as _t
+
+from anker.card_generation import batching, governor, translation
+
+logger = logging.getLogger(__name__)
+
+
+@enum.unique
+class OutputFormat(enum.Enum):
+    TSV = "tsv"
+    JSONL = "jsonl"
+
+
+TSV_COLUMNS = ("source", "backend", "part_of_speech", "candidates", "latency_ms")
+ERROR_BACKEND = "error"
+
+
+@dataclasses.dataclass(frozen=True)
+class BulkTranslationRow:
+    source: str
+    backend: str
+    part_of_speech: _t.Optional[str]
+    candidates: tuple[str, ...]
+    latency_ms: float
+
+    def to_tsv(self) -> str:
+        # Tabs and line breaks inside values would break the table
+        return "\t".join(
+            " ".join(value.split())
+            for value in (
+                self.source,
+                self.backend,
+                self.part_of_speech or "",
+                " | ".join(self.candidates),
+                f"{self.latency_ms:.1f}",
+            )
+        )
+
+    def to_jsonl(self) -> str:
+        return json.dumps(
+            {
+                "source": self.source,
+                "backend": self.backend,
+                "part_of_speech": self.part_of_speech,
+                "candidates": self.candidates,
+                "latency_ms": round(self.latency_ms, 1),
+            },
+            ensure_ascii=False,
+        )
+
+
+def _make_row(
+    source: str,
+    backend: str,
+    translation_result: translation.TranslationResult,
+    latency_ms: float,
+) -> BulkTranslationRow:
+    return BulkTranslationRow(
+        source=source,
+        backend=backend,
+        part_of_speech=(
+            translation_result.part_of_speech.value
+            if translation_result.part_of_speech
+            else None
+        ),
+        candidates=tuple(
+            translation.format_translation_result_iterator(translation_result)
+        ),
+        latency_ms=latency_ms,
+    )
+
+
+def translate_source(
+    from_language: str, to_language: str, source: str
+) -> tuple[BulkTranslationRow, ...]:
+    # Every backend gets its own row with the time until its result was ready,
+    # backends run concurrently, so it is the latency of the backend itself.
+    # A source without translations gets a row without a backend.
+    start = time.monotonic()
+    rows = []
+    try:
+        # Interactive requests of a running bot go first
+        with governor.use_priority(governor.Priority.BULK):
+            for backend, translation_result in translation.iterate_backend_translations(
+                from_language, to_language, source
+            ):
+                if translation_result is not None:
+                    latency_ms = (time.monotonic() - start) * 1000
+                    rows.append(
+                        _make_row(source, backend, translation_result, latency_ms)
+                    )
+    except Exception:
+        logger.exception(msg={"comment": "unable to translate", "source": source})
+        latency_ms = (time.monotonic() - start) * 1000
+        rows.append(BulkTranslationRow(source, ERROR_BACKEND, None, (), latency_ms))
+    if rows:
+        return tuple(rows)
+    latency_ms = (time.monotonic() - start) * 1000
+    return (BulkTranslationRow(source, "", None, (), latency_ms),)
+
+
+def read_sources(paths: _t.Sequence[str]) -> _t.Iterator[str]:
+    # Reads lines lazily from the files or from stdin without paths
+    with fileinput.input(files=paths or ("-",), encoding="utf-8") as lines:
+        for line in lines:
+            if source := line.strip():
+                yield source
+
+
+def parse_arguments(arguments: _t.Sequence[str]) -> argparse.Namespace:
+    languages = translation.get_available_languages()
+    parser = argparse.ArgumentParser(
+        prog="python -m anker.card_generation.bulk_translate",
+        description="Translate words or phrases, one per line, "
+        "and stream a row per backend result to stdout",
+    )
+    parser.add_argument(
+        "--from", dest="from_language", required=True, choices=languages
+    )
+    parser.add_argument("--to", dest="to_language", required=True, choices=languages)
+    parser.add_argument(
+        "--format",
+        default=OutputFormat.TSV.value,
+        choices=tuple(output_format.value for output_format in OutputFormat),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("ANKER_BULK_TRANSLATE_WORKERS", "16")),
+        help="sources translated at the same time, so batching backends "
+        "get full batches",
+    )
+    parser.add_argument("paths", nargs="*", help="input files, stdin by default")
+    return parser.parse_args(arguments)
+
+
+def main(arguments: _t.Sequence[str], output: _t.TextIO) -> int:
+    parsed_arguments = parse_arguments(arguments)
+    output_format = OutputFormat(parsed_arguments.format)
+    translation.initialize_translation_packages()
+    if output_format is OutputFormat.TSV:
+        output.write("\t".join(TSV_COLUMNS) + "\n")
+    rows_count = 0
+    for rows in batching.map_ordered(
+        lambda source: translate_source(
+            parsed_arguments.from_language, parsed_arguments.to_language, source
+        ),
+        read_sources(parsed_arguments.paths),
+        max_workers=parsed_arguments.workers,
+        max_pending=2 * parsed_arguments.workers,
+    ):
+        for row in rows:
+            match output_format:
+                case OutputFormat.TSV:
+                    output.write(row.to_tsv() + "\n")
+                case OutputFormat.JSONL:
+                    output.write(row.to_jsonl() + "\n")
+        output.flush()
+        rows_count += len(rows)
+    logger.info(msg={"comment": "bulk translation is done", "rows": rows_count})
+    return 0
+
+
+if __name__ == "__main__":
+    # Rows go to stdout, logs go to stderr
+    logging.basicConfig(
+        format="[%(asctime)s] %(name)s %(levelname)s in "
+        "%(filename)s:%(lineno)d : %(message)s"
+    )
+    logging.getLogger().setLevel(logging.INFO)
+    sys.exit(main(sys.argv[1:], sys.stdout))
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import pathlib
+import sqlite3
+import sys
+import threading
+import time
+import typing as _t
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+SQLITE_BUSY_TIMEOUT_SECONDS = 30.0
+# Access times of hits are kept in memory and written in bulk, so reads don't
+# take the write lock shared by every worker process.
+ACCESS_TIMES_FLUSH_INTERVAL_SECONDS = 10.0
+ACCESS_TIMES_FLUSH_SIZE = 256
+# Eviction frees a bit more than needed, so it doesn't run on every insert
+# once the cache is full.
+EVICTION_TARGET_RATIO = 0.9
+TOTAL_SIZE_NAME = "total_size"
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_key(
+    from_language: str, to_language: str, text: str, backends: _t.Iterable[str]
+) -> str:
+    # Texts keep their case, e.g. "Essen" and "essen" are different words
+    return json.dumps(
+        [
+            from_language.strip().lower(),
+            to_language.strip().lower(),
+            normalize_text(text),
+            sorted(set(backends)),
+        ],
+        ensure_ascii=False,
+    )
+
+
+class TranslationCache:
+    # SQLite in WAL mode lets several worker processes read and write the same
+    # file concurrently, while every thread keeps its own connection.
+    def __init__(self, path: pathlib.Path, max_size_bytes: int):
+        assert max_size_bytes > 0, max_size_bytes
+        self._path = path
+        self._max_size_bytes = max_size_bytes
+        self._local = threading.local()
+        self._accessed_at: dict[str, float] = {}
+        self._accessed_at_lock = threading.Lock()
+        self._accessed_at_flushed_at = time.monotonic()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._get_connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS translations_accessed_at "
+                "ON translations (accessed_at)"
+            )
+            self._create_total_size(connection)
+
+    def _create_total_size(self, connection: sqlite3.Connection) -> None:
+        # The total size is kept up to date by triggers, so neither inserts
+        # nor evictions have to sum up the whole table
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS metadata "
+            "(name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        connection.execute(
+            "INSERT OR IGNORE INTO metadata (name, value) "
+            "SELECT ?, COALESCE(SUM(size), 0) FROM translations",
+            (TOTAL_SIZE_NAME,),
+        )
+        for name, event, change in (
+            ("translations_insert", "INSERT", "new.size"),
+            ("translations_update", "UPDATE OF size", "new.size - old.size"),
+            ("translations_delete", "DELETE", "-old.size"),
+        ):
+            connection.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON translations "
+                f"BEGIN UPDATE metadata SET value = value + {change} "
+                f"WHERE name = '{TOTAL_SIZE_NAME}'; END"
+            )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> _t.Optional[str]:
+        row = (
+            self._get_connection()
+            .execute("SELECT value FROM translations WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        self._touch(key)
+        return row[0]
+
+    def contains(self, key: str) -> bool:
+        # Unlike `get` doesn't count as an access
+        row = (
+            self._get_connection()
+            .execute("SELECT 1 FROM translations WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return row is not None
+
+    def _touch(self, key: str) -> None:
+        with self._accessed_at_lock:
+            self._accessed_at[key] = time.time()
+            should_flush = (
+                len(self._accessed_at) >= ACCESS_TIMES_FLUSH_SIZE
+                or time.monotonic() - self._accessed_at_flushed_at
+                >= ACCESS_TIMES_FLUSH_INTERVAL_SECONDS
+            )
+        if should_flush:
+            self.flush_access_times()
+
+    def flush_access_times(self) -> None:
+        with self._get_connection() as connection:
+            self._write_access_times(connection)
+
+    def _write_access_times(self, connection: sqlite3.Connection) -> None:
+        with self._accessed_at_lock:
+            accessed_at, self._accessed_at = self._accessed_at, {}
+            self._accessed_at_flushed_at = time.monotonic()
+        if accessed_at:
+            connection.executemany(
+                "UPDATE translations SET accessed_at = ? WHERE key = ?",
+                ((timestamp, key) for key, timestamp in accessed_at.items()),
+            )
+
+    def put(self, key: str, value: str) -> None:
+        self.put_many(((key, value),))
+
+    def put_many(self, entries: _t.Iterable[tuple[str, str]]) -> None:
+        now = time.time()
+        with self._get_connection() as connection:
+            self._write_access_times(connection)
+            # Later entries are treated as more recently used ones.
+            connection.executemany(
+                "INSERT INTO translations (key, value, size, accessed_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "value = excluded.value, size = excluded.size, "
+                "accessed_at = excluded.accessed_at",
+                (
+                    (
+                        key,
+                        value,
+                        len(key.encode()) + len(value.encode()),
+                        now + position * 1e-6,
+                    )
+                    for position, (key, value) in enumerate(entries)
+                ),
+            )
+            self._evict(connection)
+
+    def _get_total_size(self, connection: sqlite3.Connection) -> int:
+        (total_size,) = connection.execute(
+            "SELECT value FROM metadata WHERE name = ?", (TOTAL_SIZE_NAME,)
+        ).fetchone()
+        return total_size
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        total_size = self._get_total_size(connection)
+        if total_size <= self._max_size_bytes:
+            return
+        excess_size = total_size - int(self._max_size_bytes * EVICTION_TARGET_RATIO)
+        evicted_keys = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM translations ORDER BY accessed_at"
+        ):
+            evicted_keys.append((key,))
+            excess_size -= size
+            if excess_size <= 0:
+                break
+        connection.executemany("DELETE FROM translations WHERE key = ?", evicted_keys)
+        logger.debug(
+            msg={
+                "comment": "evict translation cache entries",
+                "count": len(evicted_keys),
+            }
+        )
+
+    def get_size_bytes(self) -> int:
+        return self._get_total_size(self._get_connection())
+
+    def checkpoint(self) -> None:
+        # Moves everything from the write-ahead log into the database file,
+        # so the file can be copied on its own.
+        self.flush_access_times()
+        with self._get_connection() as connection:
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def export_entries(self, stream: _t.TextIO) -> int:
+        count = 0
+        self.flush_access_times()
+        with self._get_connection() as connection:
+            for key, value in connection.execute(
+                "SELECT key, value FROM translations ORDER BY accessed_at DESC"
+            ):
+                stream.write(json.dumps({"key": key, "value": value}) + "\n")
+                count += 1
+        return count
+
+    def import_entries(self, stream: _t.TextIO) -> int:
+        entries = [
+            (entry["key"], entry["value"])
+            for entry in map(json.loads, filter(str.strip, stream))
+        ]
+        # Exports start from the most recently used entry, so insert them
+        # backwards to keep the recency order after the import.
+        self.put_many(reversed(entries))
+        return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export or import a persistent translation cache"
+    )
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("cache_path", type=pathlib.Path)
+    parser.add_argument("--max-size-bytes", type=int, default=64 * 1024 * 1024)
+    arguments = parser.parse_args()
+    translation_cache = TranslationCache(
+        arguments.cache_path, max_size_bytes=arguments.max_size_bytes
+    )
+    match arguments.command:
+        case "export":
+            count = translation_cache.export_entries(sys.stdout)
+        case "import":
+            count = translation_cache.import_entries(sys.stdin)
+    logger.info(msg={"comment": f"{arguments.command} cache entries", "count": count})
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    logging.getLogger().setLevel(logging.INFO)
+    main()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import json
+import logging
+import pathlib
+import re
+import typing as _t
+import xml.etree.ElementTree as ElementTree
+
+from anker.card_generation import sorted_table
+from anker.types import BaseAnkerException
+
+logger = logging.getLogger(__name__)
+
+# Translations of a word grouped by a part of speech as in WordNet, an empty
+# part of speech when a dictionary doesn't tell it, e.g.
+# (("n", ("house", "home")), ("", ("household",)))
+PartOfSpeechTranslationsT = tuple[tuple[str, tuple[str, ...]], ...]
+
+# Abbreviations used by dictionaries mapped to WordNet parts of speech. Only
+# unambiguous ones, e.g. "s" is a satellite adjective in WordNet.
+PARTS_OF_SPEECH = {
+    "n": "n",
+    "noun": "n",
+    "subst": "n",
+    "v": "v",
+    "verb": "v",
+    "a": "a",
+    "adj": "a",
+    "adjective": "a",
+    "adv": "r",
+    "adverb": "r",
+}
+TRANSLATION_SEPARATOR_PATTERN = re.compile(r"[;\n]|\b\d+[.)]\s")
+# Elements of a XDXF article which are not translations
+XDXF_SKIPPED_TAGS = frozenset(("k", "gr", "tr", "ex", "co"))
+
+
+class DictionaryException(BaseAnkerException):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class DictionaryEntry:
+    word: str
+    part_of_speech: str
+    translations: tuple[str, ...]
+
+
+def get_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def get_part_of_speech(raw_part_of_speech: str) -> str:
+    return PARTS_OF_SPEECH.get(raw_part_of_speech.strip().strip(".,").lower(), "")
+
+
+def _split_translations(text: str) -> tuple[str, ...]:
+    translations = (
+        " ".join(translation.split())
+        for translation in TRANSLATION_SEPARATOR_PATTERN.split(text)
+    )
+    return tuple(filter(None, translations))
+
+
+def read_tsv(lines: _t.Iterable[str]) -> _t.Iterator[DictionaryEntry]:
+    # Lines are "word<TAB>translation; translation[<TAB>part of speech]"
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip() or line.startswith("#"):
+            continue
+        columns = line.rstrip("\n").split("\t")
+        if len(columns) not in (2, 3):
+            raise DictionaryException(
+                f"line {line_number} has {len(columns)} columns instead of 2 or 3"
+            )
+        yield DictionaryEntry(
+            word=columns[0].strip(),
+            part_of_speech=get_part_of_speech(columns[2]) if len(columns) == 3 else "",
+            translations=_split_translations(columns[1]),
+        )
+
+
+def _get_text(element: ElementTree.Element) -> str:
+    return "".join(element.itertext()).strip()
+
+
+def _get_xdxf_translations(article: ElementTree.Element) -> tuple[str, ...]:
+    if translations := article.findall(".//dtrn"):
+        return tuple(filter(None, map(_get_text, translations)))
+    # Articles in the visual format keep translations as plain text
+    parts = [article.text or ""]
+    for child in article:
+        if child.tag not in XDXF_SKIPPED_TAGS:
+            parts.append(_get_text(child))
+        parts.append(child.tail or "")
+    return _split_translations("".join(parts))
+
+
+def read_xdxf(source: _t.BinaryIO) -> _t.Iterator[DictionaryEntry]:
+    # Articles are parsed one by one, so big dictionaries fit into memory
+    for _, element in ElementTree.iterparse(source, events=("end",)):
+        if element.tag != "ar":
+            continue
+        part_of_speech = element.find(".//gr")
+        translations = _get_xdxf_translations(element)
+        for key in element.findall("k"):
+            yield DictionaryEntry(
+                word=_get_text(key),
+                part_of_speech=(
+                    get_part_of_speech(_get_text(part_of_speech))
+                    if part_of_speech is not None
+                    else ""
+                ),
+                translations=translations,
+            )
+        element.clear()
+
+
+def read_source(path: pathlib.Path) -> _t.Iterator[DictionaryEntry]:
+    match path.suffix:
+        case ".tsv":
+            with open(path, encoding="utf-8") as source:
+                yield from read_tsv(source)
+        case ".xdxf":
+            with open(path, "rb") as source:
+                yield from read_xdxf(source)
+        case _:
+            raise DictionaryException(f"unknown dictionary format of {path}")
+
+
+def build_dictionary(path: pathlib.Path, entries: _t.Iterable[DictionaryEntry]) -> int:
+    translations_by_key: dict[str, dict[str, list[str]]] = {}
+    for entry in entries:
+        if not (key := get_key(entry.word)) or not entry.translations:
+            continue
+        translations = translations_by_key.setdefault(key, {}).setdefault(
+            entry.part_of_speech, []
+        )
+        translations.extend(
+            translation
+            for translation in entry.translations
+            if translation not in translations
+        )
+    logger.info(
+        msg={
+            "comment": "build dictionary",
+            "path": str(path),
+            "words": len(translations_by_key),
+        }
+    )
+    return sorted_table.write_table(
+        path,
+        (
+            (key, json.dumps(list(translations.items()), ensure_ascii=False).encode())
+            for key, translations in translations_by_key.items()
+        ),
+    )
+
+
+class BilingualDictionary:
+    # Words are keys of a memory-mapped sorted table, so a lookup is a binary
+    # search and words sharing a prefix are stored next to each other
+    def __init__(self, path: pathlib.Path):
+        self._table = sorted_table.SortedTable(path)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def lookup(self, text: str) -> PartOfSpeechTranslationsT:
+        raw_translations = self._table.get(get_key(text))
+        if raw_translations is None:
+            return ()
+        return tuple(
+            (part_of_speech, tuple(translations))
+            for part_of_speech, translations in json.loads(raw_translations)
+        )
+
+    def complete(self, prefix: str, limit: int) -> tuple[str, ...]:
+        # Words starting with the prefix in the alphabetical order
+        return tuple(
+            word
+            for word, _ in itertools.islice(
+                self._table.iterate_prefix(get_key(prefix)), limit
+            )
+        )
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import contextvars
+import dataclasses
+import enum
+import heapq
+import itertools
+import logging
+import threading
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+
+@enum.unique
+class Priority(enum.IntEnum):
+    # Lower values are served first
+    INTERACTIVE = 0
+    BULK = 1
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "priority", default=Priority.INTERACTIVE
+)
+
+
+def get_priority() -> Priority:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def use_priority(priority: Priority) -> _t.Iterator[None]:
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclasses.dataclass(frozen=True)
+class BackendBudget:
+    # threads a single engine may use for one call
+    threads: int
+    # calls running at the same time
+    concurrency: int
+
+    def __post_init__(self):
+        assert self.threads > 0, self.threads
+        assert self.concurrency > 0, self.concurrency
+
+
+class PrioritySemaphore:
+    # A semaphore which lets waiters in by priority, then in arrival order
+    def __init__(self, limit: int):
+        assert limit > 0, limit
+        self._limit = limit
+        self._active = 0
+        self._condition = threading.Condition()
+        self._queue: list[tuple[Priority, int]] = []
+        self._sequence = itertools.count()
+        self._waiting: collections.Counter[Priority] = collections.Counter()
+
+    def acquire(self, priority: Priority) -> None:
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._queue, ticket)
+            self._waiting[priority] += 1
+            self._condition.wait_for(
+                lambda: self._active < self._limit and self._queue[0] == ticket
+            )
+            heapq.heappop(self._queue)
+            self._waiting[priority] -= 1
+            self._active += 1
+            # the next waiter may fit as well
+            self._condition.notify_all()
+
+    def release(self) -> None:
+        with self._condition:
+            assert self._active > 0
+            self._active -= 1
+            self._condition.notify_all()
+
+    def get_queue_depths(self) -> dict[Priority, int]:
+        with self._condition:
+            return {priority: self._waiting[priority] for priority in Priority}
+
+
+class Governor:
+    # Keeps backends from oversubscribing CPU cores: every governed backend
+    # gets a thread budget for its engines and a limit of concurrent calls,
+    # and interactive calls overtake queued bulk ones.
+    def __init__(self, budgets: _t.Mapping[str, BackendBudget]):
+        self._budgets = dict(budgets)
+        self._semaphores = {
+            backend: PrioritySemaphore(budget.concurrency)
+            for backend, budget in self._budgets.items()
+        }
+
+    def get_budget(self, backend: str) -> BackendBudget:
+        return self._budgets[backend]
+
+    @contextlib.contextmanager
+    def acquire(
+        self, backend: str, priority: _t.Optional[Priority] = None
+    ) -> _t.Iterator[None]:
+        semaphore = self._semaphores.get(backend)
+        if semaphore is None:
+            yield
+            return
+        semaphore.acquire(get_priority() if priority is None else priority)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def get_queue_depths(self) -> dict[str, dict[Priority, int]]:
+        return {
+            backend: semaphore.get_queue_depths()
+            for backend, semaphore in self._semaphores.items()
+        }
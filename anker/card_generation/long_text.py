@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import concurrent.futures
+import contextvars
+import dataclasses
+import logging
+import re
+import typing as _t
+
+from anker.types import BaseAnkerException
+
+logger = logging.getLogger(__name__)
+
+# Sentences end with punctuation followed by whitespace or with a line break
+SENTENCE_SEPARATOR_PATTERN = re.compile(r"((?<=[.!?…])\s+|\s*\n\s*)")
+PENDING_PLACEHOLDER = "…"
+
+
+class InputTooLongException(BaseAnkerException):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class Segment:
+    text: str
+    # whitespace which follows the text in the original
+    separator: str
+
+
+def split_sentences(text: str) -> tuple[Segment, ...]:
+    parts = SENTENCE_SEPARATOR_PATTERN.split(text)
+    # Separators are captured, so texts and separators alternate
+    texts, separators = parts[::2], parts[1::2] + [""]
+    return tuple(
+        Segment(text, separator)
+        for text, separator in zip(texts, separators)
+        if text or separator
+    )
+
+
+def is_long_text(text: str, min_words: int, min_chars: int) -> bool:
+    # Short phrases with punctuation, e.g. "z.B. Haus", are translated as
+    # a whole, only the length of a text matters
+    return len(text.split()) >= min_words or len(text.strip()) >= min_chars
+
+
+class LongTextTranslation:
+    # Reassembles translations of segments in the original order, segments
+    # which are not translated yet are shown as a placeholder
+    def __init__(self, segments: _t.Sequence[Segment]):
+        self._segments = tuple(segments)
+        self._translations: list[_t.Optional[str]] = [
+            None if segment.text else "" for segment in self._segments
+        ]
+
+    def get_pending(self) -> tuple[int, ...]:
+        return tuple(
+            index
+            for index, translation in enumerate(self._translations)
+            if translation is None
+        )
+
+    def set(self, index: int, translation: _t.Optional[str]) -> None:
+        # Untranslatable segments are kept as they are
+        self._translations[index] = (
+            translation if translation is not None else self._segments[index].text
+        )
+
+    def render(self) -> str:
+        return "".join(
+            (translation if translation is not None else PENDING_PLACEHOLDER)
+            + segment.separator
+            for segment, translation in zip(self._segments, self._translations)
+        ).strip()
+
+
+def _translate_segment(
+    translate: _t.Callable[[str], _t.Optional[str]], text: str
+) -> _t.Optional[str]:
+    try:
+        return translate(text)
+    except Exception:
+        logger.exception(msg={"comment": "unable to translate a segment"})
+        return None
+
+
+def iterate_translations(
+    segments: _t.Sequence[Segment],
+    translate: _t.Callable[[str], _t.Optional[str]],
+    executor: concurrent.futures.Executor,
+) -> _t.Iterator[str]:
+    # Segments are translated concurrently, so batching backends get them as
+    # a single batch, and the whole text is yielded every time one is done
+    long_text_translation = LongTextTranslation(segments)
+    futures = {
+        # Segments are translated with the context of the caller, e.g. its
+        # priority
+        executor.submit(
+            contextvars.copy_context().run,
+            _translate_segment,
+            translate,
+            segments[index].text,
+        ): index
+        for index in long_text_translation.get_pending()
+    }
+    for future in concurrent.futures.as_completed(futures):
+        long_text_translation.set(futures[future], future.result())
+        yield long_text_translation.render()
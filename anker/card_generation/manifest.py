@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import pathlib
+import typing as _t
+
+from anker.types import BaseAnkerException
+
+logger = logging.getLogger(__name__)
+
+LanguagePairT = tuple[str, str]
+
+
+class TranslationManifestException(BaseAnkerException):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+
+@dataclasses.dataclass(frozen=True)
+class TranslationManifest:
+    mariam_models: tuple[LanguagePairT, ...]
+    argos_packages: tuple[LanguagePairT, ...]
+    wordnet_lexicons: tuple[str, ...]
+
+    def get_serialized(self) -> dict[str, _t.Any]:
+        return {
+            "mariam_models": sorted(map(list, self.mariam_models)),
+            "argos_packages": sorted(map(list, self.argos_packages)),
+            "wordnet_lexicons": sorted(self.wordnet_lexicons),
+        }
+
+    @classmethod
+    def from_serialized(
+        cls: _t.Type[TranslationManifest], data: dict[str, _t.Any]
+    ) -> TranslationManifest:
+        try:
+            return cls(
+                mariam_models=tuple(
+                    (language_from, language_to)
+                    for language_from, language_to in data["mariam_models"]
+                ),
+                argos_packages=tuple(
+                    (language_from, language_to)
+                    for language_from, language_to in data["argos_packages"]
+                ),
+                wordnet_lexicons=tuple(data["wordnet_lexicons"]),
+            )
+        except (KeyError, TypeError, ValueError) as ex:
+            raise TranslationManifestException(f"invalid manifest: {ex}") from ex
+
+
+def load_manifest(path: pathlib.Path) -> _t.Optional[TranslationManifest]:
+    if not path.exists():
+        return None
+    logger.info(msg={"comment": "load translation manifest", "path": str(path)})
+    try:
+        data = json.loads(path.read_text())
+    except json.JSONDecodeError as ex:
+        raise TranslationManifestException(f"invalid manifest: {ex}") from ex
+    return TranslationManifest.from_serialized(data)
+
+
+def save_manifest(path: pathlib.Path, manifest: TranslationManifest) -> None:
+    logger.info(msg={"comment": "save translation manifest", "path": str(path)})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest.get_serialized(), indent=2))
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import dataclasses
+import math
+import typing as _t
+
+
+@dataclasses.dataclass(frozen=True)
+class DecodingProfile:
+    num_beams: int
+    # the number of new tokens is capped relative to the input length
+    max_new_tokens_ratio: float
+    min_max_new_tokens: int
+
+    def get_generate_arguments(
+        self, input_length: int, candidates: int = 1
+    ) -> dict[str, _t.Any]:
+        num_beams = max(self.num_beams, candidates)
+        return {
+            "num_beams": num_beams,
+            # all beams are returned, since some of them decode to the same text
+            "num_return_sequences": num_beams if candidates > 1 else 1,
+            "early_stopping": num_beams > 1,
+            "max_new_tokens": max(
+                self.min_max_new_tokens,
+                math.ceil(input_length * self.max_new_tokens_ratio),
+            ),
+        }
+
+
+PROFILES = {
+    "fast": DecodingProfile(
+        num_beams=1, max_new_tokens_ratio=2.0, min_max_new_tokens=8
+    ),
+    "balanced": DecodingProfile(
+        num_beams=3, max_new_tokens_ratio=2.5, min_max_new_tokens=16
+    ),
+    "quality": DecodingProfile(
+        num_beams=6, max_new_tokens_ratio=3.0, min_max_new_tokens=32
+    ),
+}
+FAST_MAX_WORDS = 3
+BALANCED_MAX_WORDS = 20
+
+
+def choose_profile(text: str, override: _t.Optional[str] = None) -> str:
+    if override is not None:
+        assert override in PROFILES, override
+        return override
+    number_of_words = len(text.split())
+    if number_of_words <= FAST_MAX_WORDS:
+        return "fast"
+    if number_of_words <= BALANCED_MAX_WORDS:
+        return "balanced"
+    return "quality"
+
+
+@dataclasses.dataclass(frozen=True)
+class Hypothesis:
+    text: str
+    # length-normalized log-probability of the sequence
+    score: float
+
+
+HypothesesT = tuple[Hypothesis, ...]
+
+
+def get_length_order(texts: _t.Sequence[str]) -> list[int]:
+    # Indexes of texts from the shortest one, so a batch is padded less
+    return sorted(range(len(texts)), key=lambda index: len(texts[index]))
+
+
+def get_best_hypotheses(
+    texts: _t.Sequence[str], scores: _t.Sequence[float], candidates: int
+) -> HypothesesT:
+    # Beams decoding to the same text are merged keeping the best score
+    best_scores: dict[str, float] = {}
+    for text, score in zip(texts, scores):
+        best_scores[text] = max(score, best_scores.get(text, score))
+    hypotheses = sorted(
+        (Hypothesis(text, score) for text, score in best_scores.items()),
+        key=lambda hypothesis: -hypothesis.score,
+    )
+    return tuple(hypotheses[:candidates])
+
+
+def split_hypotheses(
+    order: _t.Sequence[int],
+    texts: _t.Sequence[str],
+    scores: _t.Sequence[float],
+    sequences_per_input: int,
+    candidates: int,
+) -> tuple[HypothesesT, ...]:
+    # Sequences of every input follow each other in the `order` the inputs
+    # were decoded in, the result follows the original order of the inputs
+    results: list[HypothesesT] = [()] * len(order)
+    for position, index in enumerate(order):
+        first = position * sequences_per_input
+        last = first + sequences_per_input
+        results[index] = get_best_hypotheses(
+            texts[first:last], scores[first:last], candidates
+        )
+    return tuple(results)
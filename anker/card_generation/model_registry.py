@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import collections
+import dataclasses
+import logging
+import threading
+import time
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+KeyT = _t.TypeVar("KeyT", bound=_t.Hashable)
+ModelT = _t.TypeVar("ModelT")
+
+
+@dataclasses.dataclass
+class ModelUsage:
+    is_loaded: bool = False
+    resident_bytes: int = 0
+    load_seconds: float = 0.0
+    loads: int = 0
+    hits: int = 0
+    evictions: int = 0
+
+
+class ModelRegistry(_t.Generic[KeyT, ModelT]):
+    # Loads models lazily and keeps the total size of resident models below
+    # `budget_bytes` by evicting the least recently used ones. The most recently
+    # loaded model is never evicted, even if it alone exceeds the budget.
+    def __init__(self, budget_bytes: int):
+        assert budget_bytes > 0, budget_bytes
+        self._budget_bytes = budget_bytes
+        self._models: collections.OrderedDict[KeyT, ModelT] = collections.OrderedDict()
+        self._usage: dict[KeyT, ModelUsage] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[KeyT, threading.Lock] = {}
+
+    def get(
+        self,
+        key: KeyT,
+        loader: _t.Callable[[], ModelT],
+        size_function: _t.Callable[[ModelT], int],
+    ) -> ModelT:
+        with self._lock:
+            if (model := self._get_loaded(key)) is not None:
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                if (model := self._get_loaded(key)) is not None:
+                    return model
+            started_at = time.monotonic()
+            model = loader()
+            load_seconds = time.monotonic() - started_at
+            resident_bytes = size_function(model)
+        with self._lock:
+            usage = self._usage.setdefault(key, ModelUsage())
+            usage.is_loaded = True
+            usage.resident_bytes = resident_bytes
+            usage.load_seconds = load_seconds
+            usage.loads += 1
+            self._models[key] = model
+            self._evict()
+        logger.info(
+            msg={
+                "comment": "model is loaded",
+                "model": key,
+                "resident_bytes": resident_bytes,
+                "load_seconds": load_seconds,
+            }
+        )
+        return model
+
+    def _get_loaded(self, key: KeyT) -> _t.Optional[ModelT]:
+        # expects the lock to be held
+        if key not in self._models:
+            return None
+        self._models.move_to_end(key)
+        self._usage[key].hits += 1
+        return self._models[key]
+
+    def _get_resident_bytes(self) -> int:
+        # expects the lock to be held
+        return sum(self._usage[key].resident_bytes for key in self._models)
+
+    def _evict(self):
+        # expects the lock to be held
+        while len(self._models) > 1 and self._get_resident_bytes() > self._budget_bytes:
+            key, _ = self._models.popitem(last=False)
+            usage = self._usage[key]
+            usage.is_loaded = False
+            usage.evictions += 1
+            logger.info(
+                msg={
+                    "comment": "evict model to fit into the memory budget",
+                    "model": key,
+                    "resident_bytes": usage.resident_bytes,
+                    "budget_bytes": self._budget_bytes,
+                }
+            )
+
+    def get_usage(self) -> dict[KeyT, ModelUsage]:
+        with self._lock:
+            return {
+                key: dataclasses.replace(usage) for key, usage in self._usage.items()
+            }
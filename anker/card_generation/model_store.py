@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import mmap
+import os
+import pathlib
+import struct
+import tempfile
+import typing as _t
+
+import torch
+
+from anker.types import BaseAnkerException
+
+if _t.TYPE_CHECKING:
+    from transformers import PreTrainedModel
+
+logger = logging.getLogger(__name__)
+
+# Tensors are stored in the safetensors format:
+#   header size: little-endian unsigned 64-bit integer
+#   header: JSON with a dtype, a shape and data offsets of every tensor
+#   data: raw tensor bytes without gaps
+HEADER_SIZE = struct.Struct("<Q")
+HEADER_ALIGNMENT = 8
+DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+DTYPE_NAMES = {dtype: name for name, dtype in DTYPES.items()}
+WEIGHTS_FILE_NAME = "model.safetensors"
+CONFIG_FILE_NAME = "config.json"
+
+
+class ModelStoreException(BaseAnkerException):
+    pass
+
+
+ModelT = _t.TypeVar("ModelT", bound="PreTrainedModel")
+
+
+def _get_tensor_bytes(tensor: torch.Tensor) -> memoryview:
+    return tensor.detach().cpu().contiguous().view(-1).view(torch.uint8).numpy().data
+
+
+def save_tensors(path: pathlib.Path, tensors: _t.Mapping[str, torch.Tensor]) -> None:
+    # Larger elements go first, so every tensor is aligned to its element
+    # size once the data starts at an aligned offset
+    names = sorted(tensors, key=lambda name: (-tensors[name].element_size(), name))
+    header: dict[str, _t.Any] = {}
+    data_offset = 0
+    for name in names:
+        tensor = tensors[name]
+        size = tensor.nelement() * tensor.element_size()
+        header[name] = {
+            "dtype": DTYPE_NAMES[tensor.dtype],
+            "shape": list(tensor.shape),
+            "data_offsets": [data_offset, data_offset + size],
+        }
+        data_offset += size
+    raw_header = json.dumps(header).encode()
+    padding = -(HEADER_SIZE.size + len(raw_header)) % HEADER_ALIGNMENT
+    raw_header += b" " * padding
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write into a temporary file first, so readers never see a partial file
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tensors_file:
+        tensors_file.write(HEADER_SIZE.pack(len(raw_header)))
+        tensors_file.write(raw_header)
+        for name in names:
+            tensors_file.write(_get_tensor_bytes(tensors[name]))
+    os.replace(tensors_file.name, path)
+
+
+def load_tensors(path: pathlib.Path) -> dict[str, torch.Tensor]:
+    # Tensors are views of a private file mapping, so nothing is read upfront
+    # and all processes share the same physical pages through the page cache
+    # until a tensor is written to.
+    with path.open("rb") as tensors_file:
+        buffer = mmap.mmap(tensors_file.fileno(), 0, access=mmap.ACCESS_COPY)
+    (header_size,) = HEADER_SIZE.unpack_from(buffer)
+    header_start = HEADER_SIZE.size
+    header_end = header_start + header_size
+    header = json.loads(buffer[header_start:header_end])
+    tensors = {}
+    for name, tensor_info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = DTYPES[tensor_info["dtype"]]
+        begin, end = tensor_info["data_offsets"]
+        if begin == end:
+            tensors[name] = torch.empty(tensor_info["shape"], dtype=dtype)
+            continue
+        element_size = torch.empty((), dtype=dtype).element_size()
+        tensors[name] = torch.frombuffer(
+            buffer,
+            dtype=dtype,
+            count=(end - begin) // element_size,
+            offset=header_end + begin,
+        ).view(tensor_info["shape"])
+    return tensors
+
+
+def is_model_stored(model_dir: pathlib.Path) -> bool:
+    return (model_dir / WEIGHTS_FILE_NAME).exists() and (
+        model_dir / CONFIG_FILE_NAME
+    ).exists()
+
+
+def save_model(model: PreTrainedModel, model_dir: pathlib.Path) -> None:
+    # Tied weights are stored once and tied again after loading
+    tensors: dict[str, torch.Tensor] = {}
+    stored_tensors: set[tuple[int, tuple[int, ...]]] = set()
+    for name, tensor in model.state_dict().items():
+        tensor_id = (tensor.data_ptr(), tuple(tensor.shape))
+        if tensor_id in stored_tensors:
+            continue
+        stored_tensors.add(tensor_id)
+        tensors[name] = tensor
+    save_tensors(model_dir / WEIGHTS_FILE_NAME, tensors)
+    model.config.save_pretrained(model_dir)
+    logger.info(msg={"comment": "model is stored", "path": str(model_dir)})
+
+
+def load_model(model_class: _t.Type[ModelT], model_dir: pathlib.Path) -> ModelT:
+    config = model_class.config_class.from_pretrained(model_dir)
+    # Parameters are created on the meta device, which allocates nothing,
+    # and then replaced by the memory-mapped tensors
+    with torch.device("meta"):
+        model = model_class(config)
+    model.load_state_dict(
+        load_tensors(model_dir / WEIGHTS_FILE_NAME), strict=False, assign=True
+    )
+    model.tie_weights()
+    not_loaded = [
+        name
+        for name, tensor in itertools.chain(
+            model.named_parameters(), model.named_buffers()
+        )
+        if tensor.is_meta
+    ]
+    if not_loaded:
+        raise ModelStoreException(f"tensors are missing in {model_dir}: {not_loaded}")
+    return model.eval()
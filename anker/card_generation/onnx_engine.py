@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import threading
+import typing as _t
+
+import numpy as np
+import onnxruntime
+
+logger = logging.getLogger(__name__)
+
+# Files of a model exported by `optimum` without merging the decoders
+ENCODER_FILE_NAME = "encoder_model.onnx"
+DECODER_FILE_NAME = "decoder_model.onnx"
+DECODER_WITH_PAST_FILE_NAME = "decoder_with_past_model.onnx"
+CONFIG_FILE_NAME = "config.json"
+PAST_PREFIX = "past_key_values."
+PRESENT_PREFIX = "present."
+
+PastT = dict[str, np.ndarray]
+# encoder, decoder and decoder with past
+SessionsT = tuple[
+    onnxruntime.InferenceSession,
+    onnxruntime.InferenceSession,
+    onnxruntime.InferenceSession,
+]
+
+
+@dataclasses.dataclass(frozen=True)
+class GenerateOutput:
+    # Same fields as an output of `generate` from `transformers`: sequences
+    # start with the decoder start token and are padded with the pad token
+    sequences: np.ndarray
+    sequences_scores: np.ndarray
+
+
+def _log_softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    return shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+
+
+@dataclasses.dataclass
+class _Hypotheses:
+    # Finished hypotheses of a single input
+    num_beams: int
+    length_penalty: float
+    items: list[tuple[float, list[int]]] = dataclasses.field(default_factory=list)
+
+    def add(self, tokens: list[int], sum_log_probs: float, length: int) -> None:
+        self.items.append((sum_log_probs / (length**self.length_penalty), tokens))
+
+    def is_done(self) -> bool:
+        return len(self.items) >= self.num_beams
+
+    def get_best(self, count: int) -> list[tuple[float, list[int]]]:
+        return sorted(self.items, key=lambda item: -item[0])[:count]
+
+
+class OnnxMarianEngine:
+    # Runs an exported Marian encoder once and then its decoder step by step,
+    # feeding keys and values of previous steps back, so every step only
+    # computes the newest token. Beam search follows `transformers` with
+    # early stopping.
+    def __init__(self, model_dir: pathlib.Path, threads: int):
+        self._model_dir = model_dir
+        self._threads = threads
+        self._sessions: _t.Optional[SessionsT] = None
+        self._sessions_pid: _t.Optional[int] = None
+        self._lock = threading.Lock()
+        config = json.loads((model_dir / CONFIG_FILE_NAME).read_text())
+        self._decoder_start_token_id: int = config["decoder_start_token_id"]
+        self._eos_token_id: int = config["eos_token_id"]
+        self._pad_token_id: int = config["pad_token_id"]
+        self._length_penalty: float = config.get("length_penalty", 1.0)
+
+    def _get_sessions(self) -> SessionsT:
+        # Sessions start their thread pools when they are created and forked
+        # processes don't get them, so every process creates its own sessions
+        with self._lock:
+            if self._sessions is None or self._sessions_pid != os.getpid():
+                options = onnxruntime.SessionOptions()
+                options.intra_op_num_threads = self._threads
+                options.inter_op_num_threads = 1
+                options.graph_optimization_level = (
+                    onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+                )
+                encoder, decoder, decoder_with_past = (
+                    onnxruntime.InferenceSession(
+                        str(self._model_dir / file_name),
+                        options,
+                        providers=["CPUExecutionProvider"],
+                    )
+                    for file_name in (
+                        ENCODER_FILE_NAME,
+                        DECODER_FILE_NAME,
+                        DECODER_WITH_PAST_FILE_NAME,
+                    )
+                )
+                self._sessions = (encoder, decoder, decoder_with_past)
+                self._sessions_pid = os.getpid()
+            return self._sessions
+
+    def get_size_bytes(self) -> int:
+        return sum(
+            path.stat().st_size for path in self._model_dir.iterdir() if path.is_file()
+        )
+
+    def _decode_step(
+        self,
+        tokens: np.ndarray,
+        encoder_hidden_states: np.ndarray,
+        encoder_attention_mask: np.ndarray,
+        past: _t.Optional[PastT],
+    ) -> tuple[np.ndarray, PastT]:
+        _, decoder, decoder_with_past = self._get_sessions()
+        session = decoder if past is None else decoder_with_past
+        feed = {
+            "input_ids": tokens,
+            "encoder_hidden_states": encoder_hidden_states,
+            "encoder_attention_mask": encoder_attention_mask,
+            **(past or {}),
+        }
+        input_names = {session_input.name for session_input in session.get_inputs()}
+        output_names = [session_output.name for session_output in session.get_outputs()]
+        outputs = dict(
+            zip(
+                output_names,
+                session.run(
+                    output_names,
+                    {
+                        name: value
+                        for name, value in feed.items()
+                        if name in input_names
+                    },
+                ),
+            )
+        )
+        # The decoder with past only returns keys and values of self-attention,
+        # the ones of cross-attention stay the same
+        new_past = dict(past or {})
+        for name, value in outputs.items():
+            if name.startswith(PRESENT_PREFIX):
+                new_past[PAST_PREFIX + name.removeprefix(PRESENT_PREFIX)] = value
+        return outputs["logits"][:, -1, :], new_past
+
+    def _select_beams(
+        self,
+        scores: np.ndarray,
+        beam_tokens: list[list[int]],
+        hypotheses: list[_Hypotheses],
+    ) -> tuple[list[int], list[int], np.ndarray]:
+        batch_size, num_beams = len(hypotheses), hypotheses[0].num_beams
+        vocabulary_size = scores.shape[1] // num_beams
+        candidates_count = 2 * num_beams
+        top_candidates = np.argpartition(-scores, candidates_count - 1, axis=1)
+        beam_indices: list[int] = []
+        tokens: list[int] = []
+        beam_scores = np.zeros((batch_size, num_beams), dtype=np.float32)
+        for batch_index, batch_hypotheses in enumerate(hypotheses):
+            first_beam_index = batch_index * num_beams
+            if batch_hypotheses.is_done():
+                beam_indices.extend(
+                    range(first_beam_index, first_beam_index + num_beams)
+                )
+                tokens.extend([self._pad_token_id] * num_beams)
+                continue
+            candidates = top_candidates[batch_index, :candidates_count]
+            candidates = candidates[np.argsort(-scores[batch_index, candidates])]
+            for rank, candidate in enumerate(candidates):
+                beam, token = divmod(int(candidate), vocabulary_size)
+                beam_index = first_beam_index + beam
+                score = float(scores[batch_index, candidate])
+                if token == self._eos_token_id:
+                    if rank < num_beams:
+                        finished_tokens = beam_tokens[beam_index] + [token]
+                        batch_hypotheses.add(
+                            finished_tokens, score, length=len(finished_tokens)
+                        )
+                    continue
+                beam_scores[batch_index, len(beam_indices) - first_beam_index] = score
+                beam_indices.append(beam_index)
+                tokens.append(token)
+                if len(beam_indices) == first_beam_index + num_beams:
+                    break
+        return beam_indices, tokens, beam_scores
+
+    def _get_output(
+        self, hypotheses: list[_Hypotheses], num_return_sequences: int
+    ) -> GenerateOutput:
+        best = [
+            item
+            for batch_hypotheses in hypotheses
+            for item in batch_hypotheses.get_best(num_return_sequences)
+        ]
+        length = 1 + max(len(tokens) for _, tokens in best)
+        sequences = np.full((len(best), length), self._pad_token_id, dtype=np.int64)
+        for position, (_, tokens) in enumerate(best):
+            tokens_end = len(tokens) + 1
+            sequences[position, 0] = self._decoder_start_token_id
+            sequences[position, 1:tokens_end] = tokens
+        return GenerateOutput(
+            sequences=sequences,
+            sequences_scores=np.array([score for score, _ in best], dtype=np.float32),
+        )
+
+    def generate(
+        self,
+        input_ids: np.ndarray,
+        attention_mask: np.ndarray,
+        max_new_tokens: int,
+        num_beams: int = 1,
+        num_return_sequences: int = 1,
+        **_kwargs: _t.Any,
+    ) -> GenerateOutput:
+        assert 0 < num_return_sequences <= num_beams, (num_return_sequences, num_beams)
+        batch_size = input_ids.shape[0]
+        attention_mask = attention_mask.astype(np.int64)
+        encoder, _, _ = self._get_sessions()
+        (encoder_hidden_states,) = encoder.run(
+            ["last_hidden_state"],
+            {"input_ids": input_ids.astype(np.int64), "attention_mask": attention_mask},
+        )
+        encoder_hidden_states = np.repeat(encoder_hidden_states, num_beams, axis=0)
+        encoder_attention_mask = np.repeat(attention_mask, num_beams, axis=0)
+        hypotheses = [
+            _Hypotheses(num_beams, self._length_penalty) for _ in range(batch_size)
+        ]
+        # Only the first beam is expanded at the first step
+        beam_scores = np.full((batch_size, num_beams), -1e9, dtype=np.float32)
+        beam_scores[:, 0] = 0.0
+        beam_tokens: list[list[int]] = [[] for _ in range(batch_size * num_beams)]
+        next_tokens = np.full(
+            (batch_size * num_beams, 1), self._decoder_start_token_id, dtype=np.int64
+        )
+        past: _t.Optional[PastT] = None
+        for _ in range(max_new_tokens):
+            logits, past = self._decode_step(
+                next_tokens, encoder_hidden_states, encoder_attention_mask, past
+            )
+            log_probs = _log_softmax(logits.astype(np.float32))
+            log_probs[:, self._pad_token_id] = -np.inf
+            scores = (log_probs + beam_scores.reshape(-1, 1)).reshape(batch_size, -1)
+            beam_indices, tokens, beam_scores = self._select_beams(
+                scores, beam_tokens, hypotheses
+            )
+            if all(batch_hypotheses.is_done() for batch_hypotheses in hypotheses):
+                break
+            beam_tokens = [
+                beam_tokens[beam_index] + [token]
+                for beam_index, token in zip(beam_indices, tokens)
+            ]
+            next_tokens = np.array(tokens, dtype=np.int64).reshape(-1, 1)
+            # Only self-attention depends on the beam history
+            past = {
+                name: value[beam_indices] if ".decoder." in name else value
+                for name, value in past.items()
+            }
+        else:
+            # The length limit is reached before every input has enough
+            # finished hypotheses
+            for batch_index, batch_hypotheses in enumerate(hypotheses):
+                if batch_hypotheses.is_done():
+                    continue
+                for beam in range(num_beams):
+                    tokens = beam_tokens[batch_index * num_beams + beam]
+                    batch_hypotheses.add(
+                        tokens,
+                        float(beam_scores[batch_index, beam]),
+                        length=len(tokens) + 1,
+                    )
+        return self._get_output(hypotheses, num_return_sequences)
+
+
+def export_model(model_name: str, model_dir: pathlib.Path, local_files_only: bool):
+    # Exporting needs torch and optimum, which lean images running exported
+    # models don't have
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import MarianTokenizer
+
+    logger.info(msg={"comment": "export a model to onnx", "model": model_name})
+    ORTModelForSeq2SeqLM.from_pretrained(
+        model_name,
+        export=True,
+        use_cache=True,
+        use_merged=False,
+        local_files_only=local_files_only,
+    ).save_pretrained(model_dir)
+    MarianTokenizer.from_pretrained(
+        model_name, local_files_only=local_files_only
+    ).save_pretrained(model_dir)
+
+
+def is_model_exported(model_dir: pathlib.Path) -> bool:
+    return all(
+        (model_dir / file_name).exists()
+        for file_name in (
+            ENCODER_FILE_NAME,
+            DECODER_FILE_NAME,
+            DECODER_WITH_PAST_FILE_NAME,
+            CONFIG_FILE_NAME,
+        )
+    )
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import threading
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+# (engine, language from, language to)
+HopT = tuple[str, str, str]
+RouteT = tuple[HopT, ...]
+
+
+class PivotGraph:
+    # Languages are nodes and models of every engine are edges, weighted by
+    # their measured latency per translated text. A route is the cheapest chain
+    # of hops, so a pair without a direct model is translated through pivot
+    # languages.
+    def __init__(
+        self,
+        hops: _t.Iterable[HopT],
+        default_latency_seconds: float,
+        max_hops: int,
+        smoothing: float = 0.2,
+        hop_penalty_seconds: float = 0.0,
+    ):
+        assert default_latency_seconds > 0, default_latency_seconds
+        assert max_hops > 0, max_hops
+        assert 0 < smoothing <= 1, smoothing
+        assert hop_penalty_seconds >= 0, hop_penalty_seconds
+        self._hops = tuple(dict.fromkeys(hops))
+        self._default_latency_seconds = default_latency_seconds
+        self._max_hops = max_hops
+        self._hop_penalty_seconds = hop_penalty_seconds
+        self._smoothing = smoothing
+        self._latencies: dict[HopT, float] = {}
+        self._lock = threading.Lock()
+
+    def record_latency(self, hop: HopT, seconds: float) -> None:
+        with self._lock:
+            if (latency := self._latencies.get(hop)) is None:
+                self._latencies[hop] = seconds
+            else:
+                # An exponential moving average follows load changes
+                self._latencies[hop] = latency + self._smoothing * (seconds - latency)
+
+    def get_latencies(self) -> dict[HopT, float]:
+        with self._lock:
+            return dict(self._latencies)
+
+    def _get_costs(self, hops: _t.Sequence[HopT]) -> dict[HopT, float]:
+        latencies = self.get_latencies()
+        # Unmeasured hops are as slow as the slowest measured one, so they
+        # never undercut a measured route. Every hop costs a penalty for its
+        # overhead, so a direct hop wins over pivots of the same latency.
+        unmeasured_latency = max((self._default_latency_seconds, *latencies.values()))
+        return {
+            hop: latencies.get(hop, unmeasured_latency) + self._hop_penalty_seconds
+            for hop in hops
+        }
+
+    def find_route(
+        self,
+        language_from: str,
+        language_to: str,
+        engines: _t.Optional[_t.Collection[str]] = None,
+        last_engine: _t.Optional[str] = None,
+    ) -> RouteT:
+        # Returns the cheapest route with at most `max_hops` hops using only
+        # `engines`, which ends with a hop of `last_engine`, or an empty one
+        hops = [hop for hop in self._hops if engines is None or hop[0] in engines]
+        costs = self._get_costs(hops)
+        # Routes to every reachable language without the last hop
+        routes: dict[str, tuple[float, RouteT]] = {language_from: (0.0, ())}
+        for _ in range(self._max_hops - 1):
+            routes = self._relax(routes, costs)
+        candidates = []
+        for hop in hops:
+            engine, pivot_language, hop_language_to = hop
+            if hop_language_to != language_to or pivot_language not in routes:
+                continue
+            if last_engine is not None and engine != last_engine:
+                continue
+            cost, route = routes[pivot_language]
+            # Pivots never go through the target language
+            if any(language == language_to for _, _, language in route):
+                continue
+            cost += costs[hop]
+            candidates.append((cost, route + (hop,)))
+        if not candidates:
+            return ()
+        # Shorter routes win ties
+        _, route = min(
+            candidates, key=lambda candidate: (candidate[0], len(candidate[1]))
+        )
+        return route
+
+    def _relax(
+        self,
+        routes: dict[str, tuple[float, RouteT]],
+        costs: _t.Mapping[HopT, float],
+    ) -> dict[str, tuple[float, RouteT]]:
+        relaxed = dict(routes)
+        for hop, hop_cost in costs.items():
+            _, language_from, language_to = hop
+            if language_from not in routes:
+                continue
+            cost, route = routes[language_from]
+            cost += hop_cost
+            if language_to not in relaxed or cost < relaxed[language_to][0]:
+                relaxed[language_to] = (cost, route + (hop,))
+        return relaxed
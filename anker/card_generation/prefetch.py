@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import threading
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+KeyT = _t.TypeVar("KeyT", bound=_t.Hashable)
+
+
+class Prefetcher(_t.Generic[KeyT]):
+    # Runs every loader at most once in background threads. A key is ready
+    # once its loader has finished, no matter whether it failed or not.
+    def __init__(self, max_workers: int):
+        assert max_workers > 0, max_workers
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prefetch"
+        )
+        self._lock = threading.Lock()
+        self._futures: dict[KeyT, concurrent.futures.Future] = {}
+
+    def _load(self, key: KeyT, loader: _t.Callable[[], _t.Any]) -> None:
+        try:
+            loader()
+        except Exception:
+            logger.exception(msg={"comment": "failed to prefetch", "key": key})
+            return
+        logger.info(msg={"comment": "prefetched", "key": key})
+
+    def prefetch(
+        self, key: KeyT, loader: _t.Callable[[], _t.Any]
+    ) -> concurrent.futures.Future:
+        with self._lock:
+            if (future := self._futures.get(key)) is None:
+                future = self._executor.submit(self._load, key, loader)
+                self._futures[key] = future
+        return future
+
+    def is_ready(self, key: KeyT) -> bool:
+        with self._lock:
+            future = self._futures.get(key)
+        return future is not None and future.done()
+
+    def wait_any(self, keys: _t.Iterable[KeyT], timeout_seconds: float) -> bool:
+        with self._lock:
+            futures = [self._futures[key] for key in keys if key in self._futures]
+        if not futures:
+            return False
+        done, _ = concurrent.futures.wait(
+            futures,
+            timeout=timeout_seconds,
+            return_when=concurrent.futures.FIRST_COMPLETED,
+        )
+        return len(done) > 0
+
+    def wait_all(self, keys: _t.Iterable[KeyT]) -> None:
+        # Keys which are not prefetched are not waited for
+        with self._lock:
+            futures = [self._futures[key] for key in keys if key in self._futures]
+        concurrent.futures.wait(futures)
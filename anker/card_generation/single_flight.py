@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import threading
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+KeyT = _t.TypeVar("KeyT", bound=_t.Hashable)
+T = _t.TypeVar("T")
+
+
+@dataclasses.dataclass
+class SingleFlightStatistics:
+    calls: int = 0
+    coalesced: int = 0
+    in_flight: int = 0
+
+
+class _AbandonedFlightException(Exception):
+    # The leader stopped before its computation was done, e.g. its consumer
+    # closed the iterator
+    pass
+
+
+class _Flight(_t.Generic[T]):
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._items: list[T] = []
+        self._is_done = False
+        self._exception: _t.Optional[BaseException] = None
+
+    def append(self, item: T) -> None:
+        with self._condition:
+            self._items.append(item)
+            self._condition.notify_all()
+
+    def finish(self, exception: _t.Optional[BaseException] = None) -> None:
+        with self._condition:
+            self._is_done = True
+            self._exception = exception
+            self._condition.notify_all()
+
+    def iterate(self) -> _t.Iterator[T]:
+        position = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: position < len(self._items) or self._is_done
+                )
+                if position == len(self._items):
+                    if self._exception is not None:
+                        raise self._exception
+                    return
+                item = self._items[position]
+            position += 1
+            yield item
+
+
+class SingleFlight(_t.Generic[KeyT, T]):
+    # Concurrent calls with the same key share a single computation: the first
+    # caller computes items and the others receive the same items as soon as
+    # they are produced.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[KeyT, _Flight[T]] = {}
+        self._statistics = SingleFlightStatistics()
+
+    def _join(self, key: KeyT) -> tuple[_Flight[T], bool]:
+        with self._lock:
+            self._statistics.calls += 1
+            if (flight := self._flights.get(key)) is not None:
+                self._statistics.coalesced += 1
+                return flight, False
+            flight = _Flight()
+            self._flights[key] = flight
+            return flight, True
+
+    def iterate(
+        self, key: KeyT, function: _t.Callable[[], _t.Iterable[T]]
+    ) -> _t.Generator[T, None, None]:
+        flight, is_leader = self._join(key)
+        if not is_leader:
+            logger.debug(msg={"comment": "join an in-flight computation"})
+            yield from self._follow(key, function, flight)
+            return
+        exception: _t.Optional[BaseException] = None
+        try:
+            for item in function():
+                flight.append(item)
+                yield item
+        except Exception as ex:
+            exception = ex
+            raise
+        except BaseException:
+            exception = _AbandonedFlightException()
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.finish(exception)
+
+    def _follow(
+        self, key: KeyT, function: _t.Callable[[], _t.Iterable[T]], flight: _Flight[T]
+    ) -> _t.Iterator[T]:
+        received: list[T] = []
+        try:
+            for item in flight.iterate():
+                received.append(item)
+                yield item
+        except _AbandonedFlightException:
+            # The computation is started again, items which were received
+            # already are skipped
+            logger.debug(msg={"comment": "restart an abandoned computation"})
+            for item in self.iterate(key, function):
+                if item in received:
+                    received.remove(item)
+                    continue
+                yield item
+
+    def call(self, key: KeyT, function: _t.Callable[[], T]) -> T:
+        (result,) = tuple(self.iterate(key, lambda: (function(),)))
+        return result
+
+    def get_statistics(self) -> SingleFlightStatistics:
+        with self._lock:
+            return dataclasses.replace(self._statistics, in_flight=len(self._flights))
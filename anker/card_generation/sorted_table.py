@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import pathlib
+import struct
+import tempfile
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+# Layout of a table file:
+#   header: magic, number of records
+#   index: (key offset, key length, value offset, value length) for every
+#          record, sorted by the key bytes
+#   data: keys and values referenced by the index
+MAGIC = b"ANKT"
+HEADER = struct.Struct("<4sI")
+INDEX_ENTRY = struct.Struct("<QIQI")
+
+
+def write_table(path: pathlib.Path, items: _t.Iterable[tuple[str, bytes]]) -> int:
+    records = sorted((key.encode(), value) for key, value in items)
+    keys = [key for key, _ in records]
+    assert len(keys) == len(set(keys)), "keys must be unique"
+    data_offset = HEADER.size + INDEX_ENTRY.size * len(records)
+    index = bytearray()
+    data = bytearray()
+    for key, value in records:
+        key_offset = data_offset + len(data)
+        data += key
+        value_offset = data_offset + len(data)
+        data += value
+        index += INDEX_ENTRY.pack(key_offset, len(key), value_offset, len(value))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write into a temporary file first, so readers never see a partial table
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as table_file:
+        table_file.write(HEADER.pack(MAGIC, len(records)))
+        table_file.write(index)
+        table_file.write(data)
+    os.replace(table_file.name, path)
+    logger.info(msg={"comment": "table is written", "path": str(path)})
+    return len(records)
+
+
+class SortedTable:
+    # A read-only string to bytes mapping over a memory-mapped file. Lookups
+    # are binary searches over the index, so nothing is loaded upfront and
+    # forked processes share the pages through the page cache.
+    def __init__(self, path: pathlib.Path):
+        with open(path, "rb") as table_file:
+            self._mmap = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a table file")
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _get_entry(self, position: int) -> tuple[int, int, int, int]:
+        return INDEX_ENTRY.unpack_from(
+            self._mmap, HEADER.size + INDEX_ENTRY.size * position
+        )
+
+    def _get_key(self, position: int) -> bytes:
+        key_offset, key_length, _, _ = self._get_entry(position)
+        key_end = key_offset + key_length
+        return self._mmap[key_offset:key_end]
+
+    def _get_value(self, position: int) -> bytes:
+        _, _, value_offset, value_length = self._get_entry(position)
+        value_end = value_offset + value_length
+        return self._mmap[value_offset:value_end]
+
+    def _bisect_left(self, key: bytes) -> int:
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get_item(self, position: int) -> tuple[str, bytes]:
+        if not 0 <= position < self._size:
+            raise IndexError(position)
+        return self._get_key(position).decode(), self._get_value(position)
+
+    def get(self, key: str) -> _t.Optional[bytes]:
+        encoded_key = key.encode()
+        position = self._bisect_left(encoded_key)
+        if position < self._size and self._get_key(position) == encoded_key:
+            return self._get_value(position)
+        return None
+
+    def iterate_prefix(self, prefix: str) -> _t.Iterator[tuple[str, bytes]]:
+        encoded_prefix = prefix.encode()
+        for position in range(self._bisect_left(encoded_prefix), self._size):
+            key = self._get_key(position)
+            if not key.startswith(encoded_prefix):
+                return
+            yield key.decode(), self._get_value(position)
+
+    def close(self):
+        self._mmap.close()
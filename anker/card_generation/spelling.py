@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import array
+import functools
+import logging
+import pathlib
+import struct
+import typing as _t
+
+from anker.card_generation import sorted_table
+
+logger = logging.getLogger(__name__)
+
+MAX_EDIT_DISTANCE = 2
+# Only deletes of a word's prefix are indexed, which keeps the index small
+# while candidates are still verified against the whole word
+PREFIX_LENGTH = 7
+FREQUENCY = struct.Struct("<Q")
+WORD_IDS_TYPECODE = "I"
+
+
+def _delete_char(word: str, position: int) -> str:
+    next_position = position + 1
+    return word[:position] + word[next_position:]
+
+
+def _get_deletes(word: str, max_edit_distance: int) -> set[str]:
+    deletes = {word}
+    edits = {word}
+    for _ in range(max_edit_distance):
+        edits = {_delete_char(edit, i) for edit in edits for i in range(len(edit))}
+        deletes |= edits
+    return deletes
+
+
+def get_edit_distance(source: str, target: str) -> int:
+    # Optimal string alignment distance: Levenshtein distance with
+    # transpositions of adjacent characters
+    previous_row: list[int] = []
+    row = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, start=1):
+        previous_row, before_previous_row = row, previous_row
+        row = [i] + [0] * len(target)
+        for j, target_char in enumerate(target, start=1):
+            cost = 0 if source_char == target_char else 1
+            row[j] = min(
+                previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost
+            )
+            if (
+                i > 1
+                and j > 1
+                and source_char == target[j - 2]
+                and source[i - 2] == target_char
+            ):
+                row[j] = min(row[j], before_previous_row[j - 2] + 1)
+    return row[-1]
+
+
+def _get_paths(index_dir: pathlib.Path) -> tuple[pathlib.Path, pathlib.Path]:
+    return index_dir / "words.idx", index_dir / "deletes.idx"
+
+
+def build_index(index_dir: pathlib.Path, word_frequencies: _t.Mapping[str, int]):
+    words_path, deletes_path = _get_paths(index_dir)
+    words = sorted(word_frequencies)
+    sorted_table.write_table(
+        words_path, ((word, FREQUENCY.pack(word_frequencies[word])) for word in words)
+    )
+    word_ids_by_delete: dict[str, array.array] = {}
+    for word_id, word in enumerate(words):
+        for delete in _get_deletes(word[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+            word_ids_by_delete.setdefault(
+                delete, array.array(WORD_IDS_TYPECODE)
+            ).append(word_id)
+    sorted_table.write_table(
+        deletes_path,
+        (
+            (delete, word_ids.tobytes())
+            for delete, word_ids in word_ids_by_delete.items()
+        ),
+    )
+
+
+def is_index_built(index_dir: pathlib.Path) -> bool:
+    return all(path.exists() for path in _get_paths(index_dir))
+
+
+def _restore_case(original: str, corrected: str) -> str:
+    if original.isupper() and len(original) > 1:
+        return corrected.upper()
+    if original[:1].isupper():
+        return corrected[:1].upper() + corrected[1:]
+    return corrected
+
+
+class SymmetricDeleteSpellChecker:
+    # SymSpell-like spelling correction: every dictionary word is indexed by
+    # all strings reachable from it by deleting up to MAX_EDIT_DISTANCE
+    # characters, so candidates for a misspelled word are found by looking up
+    # its own deletes instead of generating all possible edits.
+    def __init__(self, index_dir: pathlib.Path):
+        words_path, deletes_path = _get_paths(index_dir)
+        self._words = sorted_table.SortedTable(words_path)
+        self._deletes = sorted_table.SortedTable(deletes_path)
+
+    def _get_candidate_ids(self, word: str) -> set[int]:
+        candidate_ids: set[int] = set()
+        for delete in _get_deletes(word[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+            raw_word_ids = self._deletes.get(delete)
+            if raw_word_ids is None:
+                continue
+            word_ids = array.array(WORD_IDS_TYPECODE)
+            word_ids.frombytes(raw_word_ids)
+            candidate_ids.update(word_ids)
+        return candidate_ids
+
+    @functools.lru_cache(maxsize=4096)
+    def correct(self, word: str) -> str:
+        lowered_word = word.lower()
+        if self._words.get(lowered_word) is not None:
+            return word
+        best_candidate: _t.Optional[tuple[int, int, str]] = None
+        for candidate_id in self._get_candidate_ids(lowered_word):
+            candidate, raw_frequency = self._words.get_item(candidate_id)
+            if abs(len(candidate) - len(lowered_word)) > MAX_EDIT_DISTANCE:
+                continue
+            distance = get_edit_distance(lowered_word, candidate)
+            if distance > MAX_EDIT_DISTANCE:
+                continue
+            (frequency,) = FREQUENCY.unpack(raw_frequency)
+            # prefer closer candidates, then more frequent ones
+            candidate_key = (distance, -frequency, candidate)
+            if best_candidate is None or candidate_key < best_candidate:
+                best_candidate = candidate_key
+        if best_candidate is None:
+            return word
+        return _restore_case(word, best_candidate[2])
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import pathlib
+import typing as _t
+
+import torch
+from transformers import MarianMTModel
+
+from anker.card_generation import model_store
+
+logger = logging.getLogger(__name__)
+
+# Everything which needs PyTorch, only imported by the `torch` Marian engine,
+# so images running exported ONNX models don't need PyTorch installed
+
+
+def set_num_threads(threads: int) -> None:
+    # Intra-op threads are shared by all models of the process
+    torch.set_num_threads(threads)
+
+
+def load_quantized_model(
+    model_name: str, model_path: _t.Optional[pathlib.Path], local_files_only: bool
+) -> MarianMTModel:
+    if model_path is not None and model_path.exists():
+        logger.info(msg={"comment": "load quantized model", "path": str(model_path)})
+        return torch.load(model_path, weights_only=False)
+    model = torch.quantization.quantize_dynamic(
+        MarianMTModel.from_pretrained(model_name, local_files_only=local_files_only),
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+    )
+    if model_path is not None:
+        logger.info(msg={"comment": "store quantized model", "path": str(model_path)})
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save(model, model_path)
+    return model
+
+
+def load_model(
+    model_name: str, model_dir: _t.Optional[pathlib.Path], local_files_only: bool
+) -> MarianMTModel:
+    if model_dir is None:
+        return MarianMTModel.from_pretrained(
+            model_name, local_files_only=local_files_only
+        )
+    if not model_store.is_model_stored(model_dir):
+        model_store.save_model(
+            MarianMTModel.from_pretrained(
+                model_name, local_files_only=local_files_only
+            ),
+            model_dir,
+        )
+    return model_store.load_model(MarianMTModel, model_dir)
+
+
+def get_model_size(model: MarianMTModel) -> int:
+    # Packed parameters of quantized layers are stored as tuples in a state dict
+    tensors = itertools.chain.from_iterable(
+        value if isinstance(value, tuple) else (value,)
+        for value in model.state_dict().values()
+    )
+    return sum(
+        tensor.nelement() * tensor.element_size()
+        for tensor in tensors
+        if isinstance(tensor, torch.Tensor)
+    )
+
+
+def get_sequence_scores(
+    model: MarianMTModel, outputs: _t.Any, pad_token_id: int
+) -> list[float]:
+    # Greedy search only reports scores of every generated token
+    transition_scores = model.compute_transition_scores(
+        outputs.sequences, outputs.scores, normalize_logits=True
+    )
+    generated_length = transition_scores.shape[1]
+    is_generated = outputs.sequences[:, -generated_length:] != pad_token_id
+    token_scores = torch.where(
+        is_generated, transition_scores, torch.zeros_like(transition_scores)
+    )
+    return (token_scores.sum(dim=1) / is_generated.sum(dim=1).clamp(min=1)).tolist()
@@ -1,21 +1,50 @@
 from __future__ import annotations
 
+import concurrent.futures
+import contextvars
 import dataclasses
 import enum
 import functools
 import itertools
+import json
 import logging
+import os
+import pathlib
+import time
 import typing as _t
 
 import argostranslate.package
-import argostranslate.translate
 
-from huggingface_hub import list_models
-from transformers import MarianMTModel, MarianTokenizer
+from huggingface_hub import list_models, try_to_load_from_cache
+from transformers import MarianTokenizer
 
 import wn as wordnet
 from spellchecker import SpellChecker
 
+from anker.card_generation import (
+    argos_batch,
+    backend_router,
+    backends,
+    batching,
+    cache,
+    dictionary,
+    governor,
+    long_text,
+    manifest,
+    mariam_decoding,
+    model_registry,
+    onnx_engine,
+    pivot_graph,
+    prefetch,
+    single_flight,
+    spelling,
+    warm_up,
+    wordnet_index,
+)
+
+if _t.TYPE_CHECKING:
+    from transformers import MarianMTModel
+
 logger = logging.getLogger(__name__)
 
 wordnet.config.allow_multithreading = True
@@ -23,6 +52,9 @@ wordnet.config.allow_multithreading = True
 MARIAM_MODEL_ORG = "Helsinki-NLP"
 MARIAM_MODEL_PREFIX = f"{MARIAM_MODEL_ORG}/opus-mt-"
 
+# The order defines the order of candidates in a merged translation result
+TRANSLATION_BACKENDS = ("wordnet", "dictionary", "argos", "mariam")
+
 
 @functools.lru_cache(maxsize=1)
 def get_wordnet_mapping() -> dict[str, str]:
@@ -42,25 +74,82 @@ def get_wordnet_name_from_language_code(language_code: str) -> str:
     return mapping[language_code]
 
 
+@functools.lru_cache(maxsize=1)
+def is_spell_check_enabled() -> bool:
+    return os.getenv("ANKER_SPELL_CHECK", "1") == "1"
+
+
+def _get_spelling_index_dir(language: str) -> pathlib.Path:
+    index_dir = os.getenv(
+        "ANKER_SPELLING_INDEX_DIR",
+        str(pathlib.Path.home() / ".cache" / "anker" / "spelling"),
+    )
+    return pathlib.Path(index_dir) / language
+
+
+def build_spelling_index(language: str) -> bool:
+    index_dir = _get_spelling_index_dir(language)
+    if spelling.is_index_built(index_dir):
+        return True
+    try:
+        word_frequency = SpellChecker(language=language).word_frequency
+    except ValueError:
+        logger.warning(
+            msg={"comment": "no spelling dictionary for a language", "lang": language}
+        )
+        return False
+    logger.info(msg={"comment": "build spelling index", "lang": language})
+    spelling.build_index(index_dir, word_frequency.dictionary)
+    return True
+
+
+@functools.lru_cache
+def get_spell_checker(
+    language: str,
+) -> _t.Optional[spelling.SymmetricDeleteSpellChecker]:
+    # The index is only built by `initialize_translation_packages`, building
+    # it takes seconds and a lot of memory, so requests go without it
+    index_dir = _get_spelling_index_dir(language)
+    if not spelling.is_index_built(index_dir):
+        logger.warning(msg={"comment": "spelling index is not built", "lang": language})
+        return None
+    return spelling.SymmetricDeleteSpellChecker(index_dir)
+
+
 def spell_check(language: str, text: str) -> str:
-    spell_checker = SpellChecker(language=language)
+    spell_checker = get_spell_checker(language)
+    if spell_checker is None:
+        return text
+    return " ".join(map(spell_checker.correct, text.split()))
 
-    def _(word: str) -> str:
-        match len(spell_checker.unknown([word])):
-            case 0:
-                return word
-            case _:
-                return spell_checker.correction(word) or word
 
-    return " ".join(map(_, text.split()))
+@functools.lru_cache(maxsize=1)
+def get_translation_manifest() -> _t.Optional[manifest.TranslationManifest]:
+    manifest_path = os.getenv("ANKER_TRANSLATION_MANIFEST_PATH")
+    if not manifest_path:
+        return None
+    return manifest.load_manifest(pathlib.Path(manifest_path))
+
+
+def _is_offline() -> bool:
+    return get_translation_manifest() is not None
 
 
-def init_wordnet_lexicons(languages: tuple[str, ...]):
+def _is_wordnet_lexicon_installed(wordnet_name: str) -> bool:
+    return len(wordnet.lexicons(lexicon=wordnet_name)) > 0
+
+
+def init_wordnet_lexicons(languages: tuple[str, ...]) -> tuple[str, ...]:
     logger.info(
         msg={"languages": languages, "comment": "initialize wordnet files and database"}
     )
-    for language in languages:
-        wordnet_name = get_wordnet_name_from_language_code(language)
+    wordnet_names = tuple(map(get_wordnet_name_from_language_code, languages))
+    for wordnet_name in wordnet_names:
+        if _is_wordnet_lexicon_installed(wordnet_name):
+            logger.debug(
+                msg={"wordnet_name": wordnet_name, "comment": "wordnet is installed"}
+            )
+            continue
         path = wordnet.download(wordnet_name, progress_handler=None)
         logger.debug(
             msg={
@@ -70,6 +159,7 @@ def init_wordnet_lexicons(languages: tuple[str, ...]):
             }
         )
         assert path.exists()
+    return wordnet_names
 
 
 TranslateFunctionT = _t.Callable[[str], tuple[str, ...]]
@@ -82,33 +172,230 @@ class ArgosTranslate:
     translate_function: TranslateFunctionT
 
 
-ARGOS_FALLBACK_LANGUAGE = "en"
+ModelKeyT = tuple[str, str, str]
 
 
-@functools.lru_cache
-def _argos_get_new_translation(
+@functools.lru_cache(maxsize=1)
+def get_model_registry() -> model_registry.ModelRegistry[ModelKeyT, _t.Any]:
+    budget_mb = int(os.getenv("ANKER_MODELS_MEMORY_BUDGET_MB", "4096"))
+    return model_registry.ModelRegistry(budget_bytes=budget_mb * 1024 * 1024)
+
+
+def get_model_usage() -> dict[ModelKeyT, model_registry.ModelUsage]:
+    return get_model_registry().get_usage()
+
+
+def _get_available_cpus() -> int:
+    return len(os.sched_getaffinity(0))
+
+
+@functools.lru_cache(maxsize=1)
+def get_translation_workers() -> int:
+    return int(os.getenv("ANKER_TRANSLATION_WORKERS", "0"))
+
+
+def _get_default_mariam_threads(cpus: int) -> int:
+    if get_translation_workers() > 0:
+        return int(os.getenv("ANKER_TRANSLATION_WORKER_TORCH_THREADS", "1"))
+    return max(1, cpus // 2)
+
+
+@functools.lru_cache(maxsize=1)
+def get_governor() -> governor.Governor:
+    # Marian runs batches with many intra-op threads, while Argos runs many
+    # single-threaded calls; WordNet lookups are cheap and not governed.
+    # Every translation worker process has its own governor, so they share
+    # the CPUs.
+    cpus = _get_available_cpus() // max(1, get_translation_workers())
+    default_budgets = {
+        "mariam": governor.BackendBudget(
+            threads=_get_default_mariam_threads(cpus), concurrency=1
+        ),
+        "argos": governor.BackendBudget(threads=1, concurrency=max(1, cpus // 2)),
+    }
+    return governor.Governor(
+        {
+            backend: governor.BackendBudget(
+                threads=int(
+                    os.getenv(f"ANKER_{backend.upper()}_THREADS", str(default.threads))
+                ),
+                concurrency=int(
+                    os.getenv(
+                        f"ANKER_{backend.upper()}_CONCURRENCY", str(default.concurrency)
+                    )
+                ),
+            )
+            for backend, default in default_budgets.items()
+        }
+    )
+
+
+def get_queue_depths() -> dict[str, dict[governor.Priority, int]]:
+    return get_governor().get_queue_depths()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_mariam_model_pairs() -> tuple[tuple[str, str], ...]:
+    if (translation_manifest := get_translation_manifest()) is not None:
+        return translation_manifest.mariam_models
+    pairs = (
+        model.modelId.removeprefix(MARIAM_MODEL_PREFIX).split("-")
+        for model in list_models(author=MARIAM_MODEL_ORG)
+        if model.modelId.startswith(MARIAM_MODEL_PREFIX)
+    )
+    # Models like "opus-mt-tc-big-en-de" are not loaded by a language pair
+    return tuple((pair[0], pair[1]) for pair in pairs if len(pair) == 2)
+
+
+@functools.lru_cache(maxsize=1)
+def get_pivot_graph() -> pivot_graph.PivotGraph:
+    # Every Marian model and Argos package is an edge, whether it is
+    # downloaded already or not
+    return pivot_graph.PivotGraph(
+        itertools.chain(
+            (("argos", *pair) for pair in _get_argos_package_mappings()),
+            (("mariam", *pair) for pair in _get_mariam_model_pairs()),
+        ),
+        default_latency_seconds=float(
+            os.getenv("ANKER_PIVOT_DEFAULT_LATENCY_MS", "100")
+        )
+        / 1000,
+        max_hops=int(os.getenv("ANKER_PIVOT_MAX_HOPS", "2")),
+        hop_penalty_seconds=float(os.getenv("ANKER_PIVOT_HOP_PENALTY_MS", "10")) / 1000,
+    )
+
+
+def get_pivot_latencies() -> dict[pivot_graph.HopT, float]:
+    return get_pivot_graph().get_latencies()
+
+
+def get_backend_route(
+    backend: str, language_from: str, language_to: str
+) -> pivot_graph.RouteT:
+    # Pivot hops may use any engine, the last hop is done by the backend
+    return get_pivot_graph().find_route(language_from, language_to, last_engine=backend)
+
+
+@functools.lru_cache(maxsize=1)
+def get_argos_settings() -> argos_batch.CTranslate2Settings:
+    budget = get_governor().get_budget("argos")
+    return argos_batch.CTranslate2Settings(
+        compute_type=os.getenv("ANKER_ARGOS_COMPUTE_TYPE", "auto"),
+        inter_threads=budget.concurrency,
+        intra_threads=budget.threads,
+        beam_size=int(os.getenv("ANKER_ARGOS_BEAM_SIZE", "4")),
+        max_batch_size=int(os.getenv("ANKER_ARGOS_BATCH_MAX_SIZE", "32")),
+    )
+
+
+def _get_installed_argos_package(
+    language_from: str, language_to: str
+) -> argostranslate.package.Package:
+    return next(
+        filter(
+            lambda p: (p.from_code, p.to_code) == (language_from, language_to),
+            argostranslate.package.get_installed_packages(),
+        )
+    )
+
+
+def _load_argos_translation(
+    language_from: str, language_to: str
+) -> argos_batch.ArgosBatchTranslator:
+    return argos_batch.ArgosBatchTranslator(
+        _get_installed_argos_package(language_from, language_to),
+        get_argos_settings(),
+    )
+
+
+def _get_argos_package_size(language_from: str, language_to: str) -> int:
+    # CTranslate2 keeps the whole model in memory, so its size on disk is
+    # a good enough estimation of the resident size
+    package = _get_installed_argos_package(language_from, language_to)
+    return sum(
+        path.stat().st_size
+        for path in pathlib.Path(package.package_path).rglob("*")
+        if path.is_file()
+    )
+
+
+def _get_argos_translation(
+    language_from: str, language_to: str
+) -> argos_batch.ArgosBatchTranslator:
+    return get_model_registry().get(
+        ("argos", language_from, language_to),
+        loader=lambda: _load_argos_translation(language_from, language_to),
+        size_function=lambda _: _get_argos_package_size(language_from, language_to),
+    )
+
+
+def translate_argos_batch(
     language_from: str,
     language_to: str,
-) -> TranslateFunctionT:
-    installed_languages = argostranslate.translate.get_installed_languages()
-    from_lang = next(filter(lambda l: l.code == language_from, installed_languages))
-    to_lang = next(filter(lambda l: l.code == language_to, installed_languages))
-    translation = from_lang.get_translation(to_lang)
-    return lambda w: (translation.translate(w),)
+    texts: _t.Sequence[str],
+    priority: _t.Optional[governor.Priority] = None,
+) -> list[str]:
+    # Pivots are separate hops of a backend route, so a batch is always
+    # translated by a single package. The translator is requested from the
+    # registry on every call, so it can be evicted between batches.
+    with get_governor().acquire(
+        "argos", governor.get_priority() if priority is None else priority
+    ):
+        start = time.monotonic()
+        translations = _get_argos_translation(
+            language_from, language_to
+        ).translate_batch(texts)
+    # Batches differ in size, so hops are weighted by the latency per text
+    get_pivot_graph().record_latency(
+        ("argos", language_from, language_to),
+        (time.monotonic() - start) / len(texts),
+    )
+    return translations
+
+
+ArgosBatchKeyT = tuple[str, str, governor.Priority]
+
+
+def _translate_argos_batch(
+    batch_key: ArgosBatchKeyT, texts: tuple[str, ...]
+) -> list[str]:
+    language_from, language_to, priority = batch_key
+    return translate_argos_batch(language_from, language_to, texts, priority)
+
+
+@functools.lru_cache(maxsize=1)
+def get_argos_batcher() -> batching.MicroBatcher[ArgosBatchKeyT, str, str]:
+    return batching.MicroBatcher(
+        _translate_argos_batch,
+        max_batch_size=get_argos_settings().max_batch_size,
+        max_wait_seconds=float(os.getenv("ANKER_ARGOS_BATCH_MAX_WAIT_MS", "5")) / 1000,
+    )
 
 
 @functools.lru_cache(maxsize=1)
 def _get_argos_package_mappings() -> dict[
     tuple[str, str], argostranslate.package.Package
 ]:
-    argostranslate.package.update_package_index()
+    if _is_offline():
+        packages = argostranslate.package.get_installed_packages()
+    else:
+        argostranslate.package.update_package_index()
+        packages = argostranslate.package.get_available_packages()
+    return {(package.from_code, package.to_code): package for package in packages}
+
+
+def _get_installed_argos_packages() -> set[tuple[str, str]]:
     return {
-        (package.from_code, package.to_code): package
-        for package in argostranslate.package.get_available_packages()
+        (package.from_code, package.to_code)
+        for package in argostranslate.package.get_installed_packages()
     }
 
 
 def _install_argos_package(argos_package: argostranslate.package.Package):
+    if (argos_package.from_code, argos_package.to_code) in (
+        _get_installed_argos_packages()
+    ):
+        return
     logger.info(
         msg={
             "comment": "install argostranslate language package",
@@ -126,95 +413,283 @@ def _install_argos_package(argos_package: argostranslate.package.Package):
     )
 
 
-def init_argostranslate(languages: tuple[str, ...]) -> None:
+def _get_argos_route(
+    language_from: str, language_to: str
+) -> tuple[tuple[str, str], ...]:
+    # Language pairs without a package are translated through pivot languages
+    return tuple(
+        (hop_from, hop_to)
+        for _, hop_from, hop_to in get_pivot_graph().find_route(
+            language_from, language_to, engines=("argos",)
+        )
+    )
+
+
+def _install_argos_language_pair(language_from: str, language_to: str) -> None:
     argos_package_mappings = _get_argos_package_mappings()
+    for pair in _get_argos_route(language_from, language_to):
+        _install_argos_package(argos_package_mappings[pair])
 
-    for language_from, language_to in itertools.permutations(languages, r=2):
-        argos_language = argos_package_mappings.get((language_from, language_to))
-        if argos_language:
-            _install_argos_package(argos_language)
-            continue
 
-        argos_language_to_fallback = argos_package_mappings.get(
-            (language_from, ARGOS_FALLBACK_LANGUAGE)
-        )
-        argos_language_from_fallback = argos_package_mappings.get(
-            (ARGOS_FALLBACK_LANGUAGE, language_to)
-        )
-        if argos_language_from_fallback and argos_language_to_fallback:
-            _install_argos_package(argos_language_to_fallback)
-            _install_argos_package(argos_language_from_fallback)
+def init_argostranslate(languages: tuple[str, ...]) -> tuple[tuple[str, str], ...]:
+    for language_from, language_to in itertools.permutations(languages, r=2):
+        _install_argos_language_pair(language_from, language_to)
+    return tuple(_get_installed_argos_packages())
 
 
 @functools.lru_cache
 def get_argostranslate(
     language_from: str, language_to: str
 ) -> _t.Optional[ArgosTranslate]:
-    argos_package_mappings = _get_argos_package_mappings()
-    argos_language = argos_package_mappings.get((language_from, language_to))
-    translate_function: _t.Optional[TranslateFunctionT]
-    if argos_language:
-        translate_function = _argos_get_new_translation(language_from, language_to)
-    else:
-        argos_language_to_fallback = argos_package_mappings.get(
-            (language_from, ARGOS_FALLBACK_LANGUAGE)
-        )
-        argos_language_from_fallback = argos_package_mappings.get(
-            (ARGOS_FALLBACK_LANGUAGE, language_to)
-        )
-        if argos_language_from_fallback and argos_language_to_fallback:
-            translation_function_to_fallback = _argos_get_new_translation(
-                language_from, ARGOS_FALLBACK_LANGUAGE
-            )
-            translation_function_from_fallback = _argos_get_new_translation(
-                ARGOS_FALLBACK_LANGUAGE, language_to
-            )
-            translate_function = lambda w: translation_function_from_fallback(
-                translation_function_to_fallback(w)[0]
-            )
-    if translate_function:
-        return ArgosTranslate(language_from, language_to, translate_function)
-    return None
+    if not get_backend_route("argos", language_from, language_to):
+        return None
+    return ArgosTranslate(
+        language_from,
+        language_to,
+        functools.partial(translate_backend_route, "argos", language_from, language_to),
+    )
+
+
+@enum.unique
+class MariamQuantization(enum.Enum):
+    NONE = "none"
+    INT8 = "int8"
+
+
+@functools.lru_cache(maxsize=1)
+def get_mariam_quantization() -> MariamQuantization:
+    return MariamQuantization(os.getenv("ANKER_MARIAM_QUANTIZATION", "none"))
+
+
+def _get_quantized_mariam_model_path(
+    from_lang: str, to_lang: str
+) -> _t.Optional[pathlib.Path]:
+    models_dir = os.getenv("ANKER_MARIAM_QUANTIZED_MODELS_DIR")
+    if not models_dir:
+        return None
+    return pathlib.Path(models_dir) / f"opus-mt-{from_lang}-{to_lang}-int8.pt"
+
+
+def _get_stored_mariam_model_dir(
+    from_lang: str, to_lang: str
+) -> _t.Optional[pathlib.Path]:
+    store_dir = os.getenv("ANKER_MODEL_STORE_DIR")
+    if not store_dir:
+        return None
+    return pathlib.Path(store_dir) / f"opus-mt-{from_lang}-{to_lang}"
+
+
+@enum.unique
+class MariamEngine(enum.Enum):
+    TORCH = "torch"
+    ONNX = "onnx"
+
+
+@functools.lru_cache(maxsize=1)
+def get_mariam_engine() -> MariamEngine:
+    return MariamEngine(os.getenv("ANKER_MARIAM_ENGINE", "torch"))
+
+
+def _get_onnx_mariam_model_dir(from_lang: str, to_lang: str) -> pathlib.Path:
+    models_dir = os.getenv(
+        "ANKER_MARIAM_ONNX_MODELS_DIR",
+        str(pathlib.Path.home() / ".cache" / "anker" / "onnx"),
+    )
+    return pathlib.Path(models_dir) / f"opus-mt-{from_lang}-{to_lang}"
+
+
+MariamModelT = _t.Union["MarianMTModel", onnx_engine.OnnxMarianEngine]
+
+
+def _load_onnx_mariam_model_and_tokenizer(
+    model_name: str, from_lang: str, to_lang: str, threads: int
+) -> tuple[MariamModelT, MarianTokenizer]:
+    model_dir = _get_onnx_mariam_model_dir(from_lang, to_lang)
+    if not onnx_engine.is_model_exported(model_dir):
+        onnx_engine.export_model(model_name, model_dir, local_files_only=_is_offline())
+    logger.info(msg={"comment": "load onnx model", "path": str(model_dir)})
+    return (
+        onnx_engine.OnnxMarianEngine(model_dir, threads),
+        MarianTokenizer.from_pretrained(model_dir, local_files_only=True),
+    )
+
+
+def _get_mariam_model_size(model_and_tokenizer: tuple[MariamModelT, _t.Any]) -> int:
+    model, _ = model_and_tokenizer
+    if isinstance(model, onnx_engine.OnnxMarianEngine):
+        return model.get_size_bytes()
+    from anker.card_generation import torch_engine
+
+    return torch_engine.get_model_size(model)
 
 
-@functools.lru_cache
 def _get_mariam_model_and_tokenizer(
     from_lang: str, to_lang: str
-) -> tuple[MarianMTModel, MarianTokenizer]:
+) -> tuple[MariamModelT, MarianTokenizer]:
+    return get_model_registry().get(
+        ("mariam", from_lang, to_lang),
+        loader=lambda: _load_mariam_model_and_tokenizer(from_lang, to_lang),
+        size_function=_get_mariam_model_size,
+    )
+
+
+def _load_mariam_model_and_tokenizer(
+    from_lang: str, to_lang: str
+) -> tuple[MariamModelT, MarianTokenizer]:
     model_name = f"{MARIAM_MODEL_PREFIX}{from_lang}-{to_lang}"
-    tokenizer = MarianTokenizer.from_pretrained(model_name)
-    model = MarianMTModel.from_pretrained(model_name)
-    return model, tokenizer
+    if get_mariam_engine() is MariamEngine.ONNX:
+        return _load_onnx_mariam_model_and_tokenizer(
+            model_name,
+            from_lang,
+            to_lang,
+            get_governor().get_budget("mariam").threads,
+        )
+    tokenizer = MarianTokenizer.from_pretrained(
+        model_name, local_files_only=_is_offline()
+    )
+    return _load_torch_mariam_model(model_name, from_lang, to_lang), tokenizer
 
 
-def init_mariam_translate(languages: tuple[str, ...]) -> None:
-    model_list = list_models()
-    model_ids = [
-        x.modelId for x in model_list if x.modelId.startswith(MARIAM_MODEL_ORG)
-    ]
-    language_mappings = {tuple(x.split("/")[1].split("-")[-2:]): x for x in model_ids}
+@functools.lru_cache(maxsize=1)
+def set_torch_threads() -> None:
+    # Intra-op threads are shared by all models of the process, so they are
+    # set once, not on every model load
+    from anker.card_generation import torch_engine
+
+    torch_engine.set_num_threads(get_governor().get_budget("mariam").threads)
+
+
+def _load_torch_mariam_model(
+    model_name: str, from_lang: str, to_lang: str
+) -> MarianMTModel:
+    # PyTorch is only imported by the torch engine
+    from anker.card_generation import torch_engine
+
+    set_torch_threads()
+    match get_mariam_quantization():
+        case MariamQuantization.INT8:
+            return torch_engine.load_quantized_model(
+                model_name,
+                _get_quantized_mariam_model_path(from_lang, to_lang),
+                local_files_only=_is_offline(),
+            )
+        case MariamQuantization.NONE:
+            return torch_engine.load_model(
+                model_name,
+                _get_stored_mariam_model_dir(from_lang, to_lang),
+                local_files_only=_is_offline(),
+            )
 
+
+def init_mariam_translate(languages: tuple[str, ...]) -> tuple[tuple[str, str], ...]:
+    initialized_models: set[tuple[str, str]] = set()
     for language_from, language_to in itertools.permutations(languages, r=2):
-        model_name = language_mappings.get((language_from, language_to))
-        if model_name:
-            _get_mariam_model_and_tokenizer(language_from, language_to)
+        # Pairs without a model are translated through pivot languages
+        for _, hop_from, hop_to in get_pivot_graph().find_route(
+            language_from, language_to, engines=("mariam",)
+        ):
+            _get_mariam_model_and_tokenizer(hop_from, hop_to)
+            initialized_models.add((hop_from, hop_to))
+    return tuple(initialized_models)
 
-        model_to_fallback = language_mappings.get(
-            (language_from, ARGOS_FALLBACK_LANGUAGE)
-        )
-        model_from_fallback = language_mappings.get(
-            (ARGOS_FALLBACK_LANGUAGE, language_to)
+
+@functools.lru_cache(maxsize=1)
+def get_mariam_decoding_profile_override() -> _t.Optional[str]:
+    profile_name = os.getenv("ANKER_MARIAM_DECODING_PROFILE", "auto")
+    if profile_name == "auto":
+        return None
+    assert profile_name in mariam_decoding.PROFILES, profile_name
+    return profile_name
+
+
+def choose_mariam_decoding_profile(text: str) -> str:
+    return mariam_decoding.choose_profile(text, get_mariam_decoding_profile_override())
+
+
+@functools.lru_cache(maxsize=1)
+def get_mariam_candidates() -> int:
+    candidates = int(os.getenv("ANKER_MARIAM_CANDIDATES", "1"))
+    assert candidates > 0, candidates
+    return candidates
+
+
+MariamBatchKeyT = tuple[str, str, str, governor.Priority]
+MariamHypothesesT = mariam_decoding.HypothesesT
+MariamBatcherT = batching.MicroBatcher[MariamBatchKeyT, str, MariamHypothesesT]
+
+
+def _get_sequence_scores(
+    model: MariamModelT, outputs: _t.Any, pad_token_id: int
+) -> list[float]:
+    if getattr(outputs, "sequences_scores", None) is not None:
+        return outputs.sequences_scores.tolist()
+    assert not isinstance(model, onnx_engine.OnnxMarianEngine), type(model)
+    from anker.card_generation import torch_engine
+
+    return torch_engine.get_sequence_scores(model, outputs, pad_token_id)
+
+
+def _translate_mariam_batch(
+    batch_key: MariamBatchKeyT, texts: tuple[str, ...]
+) -> tuple[MariamHypothesesT, ...]:
+    from_lang, to_lang, profile_name, priority = batch_key
+    candidates = get_mariam_candidates()
+    model, tokenizer = _get_mariam_model_and_tokenizer(from_lang, to_lang)
+    order = mariam_decoding.get_length_order(texts)
+    inputs = tokenizer(
+        [texts[i] for i in order],
+        # The onnx engine works on numpy arrays
+        return_tensors=(
+            "np" if isinstance(model, onnx_engine.OnnxMarianEngine) else "pt"
+        ),
+        padding=True,
+    )
+    generate_arguments = mariam_decoding.PROFILES[profile_name].get_generate_arguments(
+        input_length=inputs["input_ids"].shape[1], candidates=candidates
+    )
+    with get_governor().acquire("mariam", priority):
+        start = time.monotonic()
+        outputs = model.generate(
+            **inputs,
+            **generate_arguments,
+            output_scores=True,
+            return_dict_in_generate=True,
         )
-        if model_from_fallback and model_to_fallback:
-            _get_mariam_model_and_tokenizer(language_from, ARGOS_FALLBACK_LANGUAGE)
-            _get_mariam_model_and_tokenizer(ARGOS_FALLBACK_LANGUAGE, language_to)
+    get_pivot_graph().record_latency(
+        ("mariam", from_lang, to_lang), (time.monotonic() - start) / len(texts)
+    )
+    decoded = tokenizer.batch_decode(outputs.sequences, skip_special_tokens=True)
+    scores = _get_sequence_scores(model, outputs, tokenizer.pad_token_id)
+    return mariam_decoding.split_hypotheses(
+        order,
+        decoded,
+        scores,
+        sequences_per_input=generate_arguments["num_return_sequences"],
+        candidates=candidates,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_mariam_batcher() -> MariamBatcherT:
+    return batching.MicroBatcher(
+        _translate_mariam_batch,
+        max_batch_size=int(os.getenv("ANKER_MARIAM_BATCH_MAX_SIZE", "16")),
+        max_wait_seconds=float(os.getenv("ANKER_MARIAM_BATCH_MAX_WAIT_MS", "5")) / 1000,
+    )
 
 
 @functools.lru_cache
-def get_mariam_translation(from_language: str, to_language: str, text: str) -> str:
-    model, tokenizer = _get_mariam_model_and_tokenizer(from_language, to_language)
-    translated = model.generate(**tokenizer(text, return_tensors="pt", padding=True))
-    return " ".join(tokenizer.decode(t, skip_special_tokens=True) for t in translated)
+def get_mariam_translation(
+    from_language: str, to_language: str, text: str
+) -> MariamHypothesesT:
+    # Returns up to `get_mariam_candidates()` distinct hypotheses of a single
+    # decoding pass, the best one first.
+    # Requests with different decoding profiles or priorities are never
+    # batched together
+    profile_name = choose_mariam_decoding_profile(text)
+    return get_mariam_batcher()(
+        (from_language, to_language, profile_name, governor.get_priority()), text
+    )
 
 
 @enum.unique
@@ -251,90 +726,939 @@ class TranslationResult:
     to_language: str
     possible_translations: tuple[str, ...]
     part_of_speech: _t.Optional[WordNetPartOfSpeech]
+    part_of_speech_translations: tuple[
+        tuple[WordNetPartOfSpeech, tuple[str, ...]], ...
+    ] = ()
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "word": self.word,
+                "from_language": self.from_language,
+                "to_language": self.to_language,
+                "possible_translations": self.possible_translations,
+                "part_of_speech": (
+                    self.part_of_speech.value if self.part_of_speech else None
+                ),
+                "part_of_speech_translations": [
+                    (part_of_speech.value, translations)
+                    for part_of_speech, translations in self.part_of_speech_translations
+                ],
+            },
+            ensure_ascii=False,
+        )
 
+    @classmethod
+    def from_json(cls: _t.Type[TranslationResult], raw: str) -> TranslationResult:
+        data = json.loads(raw)
+        return cls(
+            word=data["word"],
+            from_language=data["from_language"],
+            to_language=data["to_language"],
+            possible_translations=tuple(data["possible_translations"]),
+            part_of_speech=(
+                WordNetPartOfSpeech(data["part_of_speech"])
+                if data["part_of_speech"]
+                else None
+            ),
+            part_of_speech_translations=tuple(
+                (WordNetPartOfSpeech(part_of_speech), tuple(translations))
+                for part_of_speech, translations in data.get(
+                    "part_of_speech_translations", ()
+                )
+            ),
+        )
 
-def get_wordnet_translation(from_language: str, to_language: str, text: str):
-    possible_words = wordnet.words(text, lang=from_language)
-    if len(possible_words) == 0:
+
+def _get_wordnet_index_path(
+    from_language: str, to_language: str
+) -> _t.Optional[pathlib.Path]:
+    index_dir = os.getenv("ANKER_WORDNET_INDEX_DIR")
+    if not index_dir:
         return None
-    # TODO: process several possible words
-    word = possible_words[0]
-    translation_results = word.translate(lang=to_language)
-    translations: list[str] = []
-    for translation in itertools.chain(*translation_results.values()):
-        translations.append(translation.lemma())
-    if len(translations) == 0:
+    return pathlib.Path(index_dir) / f"wordnet-{from_language}-{to_language}.idx"
+
+
+@functools.lru_cache
+def get_wordnet_index(
+    from_language: str, to_language: str
+) -> _t.Optional[wordnet_index.WordNetIndex]:
+    index_path = _get_wordnet_index_path(from_language, to_language)
+    if index_path is None or not index_path.exists():
         return None
+    return wordnet_index.WordNetIndex(index_path)
+
+
+def build_wordnet_index(language_from: str, language_to: str) -> None:
+    index_path = _get_wordnet_index_path(language_from, language_to)
+    if index_path is None or index_path.exists():
+        return
+    wordnet_index.build_index(
+        index_path, wordnet.words(lang=language_from), language_to
+    )
+
+
+def build_wordnet_indexes(languages: tuple[str, ...]) -> None:
+    for language_from, language_to in itertools.permutations(languages, r=2):
+        build_wordnet_index(language_from, language_to)
+
+
+def get_wordnet_translation(
+    from_language: str, to_language: str, text: str
+) -> _t.Optional[TranslationResult]:
+    index = get_wordnet_index(from_language, to_language)
+    if index is not None:
+        raw_translations = index.lookup(text)
+    else:
+        raw_translations = wordnet_index.collect_translations(
+            wordnet.words(text, lang=from_language), to_language
+        )
+    if len(raw_translations) == 0:
+        return None
+    return _get_part_of_speech_translation_result(
+        text, from_language, to_language, raw_translations
+    )
+
+
+def _get_part_of_speech_translation_result(
+    text: str,
+    from_language: str,
+    to_language: str,
+    raw_translations: _t.Sequence[tuple[str, tuple[str, ...]]],
+) -> TranslationResult:
+    # Translations without a part of speech are only possible translations
+    part_of_speech_translations = tuple(
+        (WordNetPartOfSpeech(part_of_speech), translations)
+        for part_of_speech, translations in raw_translations
+        if part_of_speech
+    )
     return TranslationResult(
         word=text,
         from_language=from_language,
         to_language=to_language,
-        possible_translations=tuple(translations),
-        part_of_speech=WordNetPartOfSpeech(word.pos),
+        possible_translations=tuple(
+            dict.fromkeys(
+                itertools.chain.from_iterable(
+                    translations for _, translations in raw_translations
+                )
+            )
+        ),
+        part_of_speech=(
+            part_of_speech_translations[0][0] if part_of_speech_translations else None
+        ),
+        part_of_speech_translations=part_of_speech_translations,
+    )
+
+
+def _get_dictionary_path(
+    from_language: str, to_language: str
+) -> _t.Optional[pathlib.Path]:
+    dictionaries_dir = os.getenv("ANKER_DICTIONARIES_DIR")
+    if not dictionaries_dir:
+        return None
+    return (
+        pathlib.Path(dictionaries_dir) / f"dictionary-{from_language}-{to_language}.idx"
+    )
+
+
+def _get_dictionary_sources(
+    from_language: str, to_language: str
+) -> tuple[pathlib.Path, ...]:
+    # Dumps are named by the language pair, e.g. "de-en.tsv" or "de-en.xdxf"
+    sources_dir = os.getenv("ANKER_DICTIONARY_SOURCES_DIR")
+    if not sources_dir:
+        return ()
+    return tuple(
+        sorted(pathlib.Path(sources_dir).glob(f"{from_language}-{to_language}.*"))
+    )
+
+
+def build_dictionary(language_from: str, language_to: str) -> None:
+    dictionary_path = _get_dictionary_path(language_from, language_to)
+    sources = _get_dictionary_sources(language_from, language_to)
+    if dictionary_path is None or dictionary_path.exists() or not sources:
+        return
+    dictionary.build_dictionary(
+        dictionary_path,
+        itertools.chain.from_iterable(map(dictionary.read_source, sources)),
     )
 
 
+def build_dictionaries(languages: tuple[str, ...]) -> None:
+    for language_from, language_to in itertools.permutations(languages, r=2):
+        build_dictionary(language_from, language_to)
+
+
+@functools.lru_cache
+def _open_dictionary(dictionary_path: pathlib.Path) -> dictionary.BilingualDictionary:
+    return dictionary.BilingualDictionary(dictionary_path)
+
+
+def get_dictionary(
+    from_language: str, to_language: str
+) -> _t.Optional[dictionary.BilingualDictionary]:
+    # Only opened dictionaries are cached, so a dictionary built after
+    # a lookup missed it is used right away
+    dictionary_path = _get_dictionary_path(from_language, to_language)
+    if dictionary_path is None or not dictionary_path.exists():
+        return None
+    return _open_dictionary(dictionary_path)
+
+
+def get_dictionary_translation(
+    from_language: str, to_language: str, text: str
+) -> _t.Optional[TranslationResult]:
+    bilingual_dictionary = get_dictionary(from_language, to_language)
+    if bilingual_dictionary is None:
+        return None
+    raw_translations = bilingual_dictionary.lookup(text)
+    if len(raw_translations) == 0:
+        return None
+    return _get_part_of_speech_translation_result(
+        text, from_language, to_language, raw_translations
+    )
+
+
+def get_dictionary_completions(
+    from_language: str, to_language: str, prefix: str, limit: int = 10
+) -> tuple[str, ...]:
+    bilingual_dictionary = get_dictionary(from_language, to_language)
+    if bilingual_dictionary is None:
+        return ()
+    return bilingual_dictionary.complete(prefix, limit)
+
+
+@functools.lru_cache(maxsize=1)
+def get_translation_cache() -> _t.Optional[cache.TranslationCache]:
+    cache_path = os.getenv("ANKER_TRANSLATION_CACHE_PATH")
+    if not cache_path:
+        return None
+    return cache.TranslationCache(
+        pathlib.Path(cache_path),
+        max_size_bytes=int(
+            os.getenv("ANKER_TRANSLATION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_backend_runner() -> backends.BackendRunner:
+    return backends.BackendRunner(
+        max_workers=int(os.getenv("ANKER_TRANSLATION_BACKEND_WORKERS", "16"))
+    )
+
+
+@functools.lru_cache
+def get_backend_deadline_seconds(backend: str) -> float:
+    assert backend in TRANSLATION_BACKENDS, backend
+    return float(os.getenv(f"ANKER_{backend.upper()}_DEADLINE_MS", "10000")) / 1000
+
+
+def get_backend_statistics() -> dict[str, backends.BackendStatistics]:
+    return get_backend_runner().get_statistics()
+
+
+def _prepare_text(from_language: str, input_text: str) -> str:
+    text = cache.normalize_text(input_text)
+    if not is_spell_check_enabled():
+        return text
+    corrected_text = spell_check(from_language, text)
+    if corrected_text != text:
+        logger.debug(
+            msg={
+                "comment": "text was corrected",
+                "original": text,
+                "corrected": corrected_text,
+                "lang": from_language,
+            }
+        )
+    return corrected_text
+
+
 def get_translations(
     from_language: str, to_language: str, input_text: str
 ) -> _t.Optional[TranslationResult]:
-    if False:
-        # TODO: pyspellcheck is not working properly
-        text = spell_check(from_language, input_text)
-        if input_text != text:
-            logger.debug(
-                msg={
-                    "comment": "text was corrected",
-                    "original": input_text,
-                    "corrected": text,
-                    "lang": from_language,
-                }
+    text = _prepare_text(from_language, input_text)
+    translation_results = dict(_iterate_translations(from_language, to_language, text))
+    if CACHED_BACKEND in translation_results:
+        return translation_results[CACHED_BACKEND]
+    return _merge_translation_results(
+        text,
+        from_language,
+        to_language,
+        (translation_results.get(backend) for backend in TRANSLATION_BACKENDS),
+    )
+
+
+def iterate_backend_translations(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Iterator[tuple[str, _t.Optional[TranslationResult]]]:
+    # Yields the result of every backend as soon as it is ready, or the cached
+    # result
+    text = _prepare_text(from_language, input_text)
+    yield from _iterate_translations(from_language, to_language, text)
+
+
+def iterate_translations(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Iterator[TranslationResult]:
+    # Yields candidates of every backend as soon as they are ready
+    text = _prepare_text(from_language, input_text)
+    for _, translation_result in _iterate_translations(
+        from_language, to_language, text
+    ):
+        if translation_result is not None:
+            yield translation_result
+
+
+def _translate_hop(hop: pivot_graph.HopT, text: str) -> tuple[str, ...]:
+    engine, language_from, language_to = hop
+    match engine:
+        case "argos":
+            return (
+                get_argos_batcher()(
+                    (language_from, language_to, governor.get_priority()), text
+                ),
             )
-    else:
-        text = input_text
+        case "mariam":
+            return tuple(
+                hypothesis.text
+                for hypothesis in get_mariam_translation(
+                    language_from, language_to, text
+                )
+            )
+    raise AssertionError(engine)
 
-    mariam_translation = get_mariam_translation(from_language, to_language, text)
-    possible_translations: tuple[str, ...] = (mariam_translation,)
 
+PivotTextKeyT = tuple[pivot_graph.HopT, str]
+
+
+@functools.lru_cache(maxsize=1)
+def get_pivot_flight() -> single_flight.SingleFlight[PivotTextKeyT, str]:
+    return single_flight.SingleFlight()
+
+
+@functools.lru_cache(maxsize=4096)
+def get_pivot_text(hop: pivot_graph.HopT, text: str) -> str:
+    # Backends sharing a pivot hop translate the intermediate text once,
+    # even when they ask for it at the same time
+    return get_pivot_flight().call((hop, text), lambda: _translate_hop(hop, text)[0])
+
+
+def translate_backend_route(
+    backend: str, from_language: str, to_language: str, text: str
+) -> tuple[str, ...]:
+    route = get_backend_route(backend, from_language, to_language)
+    assert route, (backend, from_language, to_language)
+    *pivot_hops, last_hop = route
+    for hop in pivot_hops:
+        text = get_pivot_text(hop, text)
+    return _translate_hop(last_hop, text)
+
+
+@functools.lru_cache(maxsize=1)
+def get_max_input_chars() -> int:
+    return int(os.getenv("ANKER_MAX_INPUT_CHARS", "2000"))
+
+
+def check_input_size(input_text: str) -> None:
+    if len(input_text) > get_max_input_chars():
+        raise long_text.InputTooLongException(
+            f"the input has {len(input_text)} characters, "
+            f"at most {get_max_input_chars()} are allowed"
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def get_long_text_min_words() -> int:
+    return int(os.getenv("ANKER_LONG_TEXT_MIN_WORDS", "20"))
+
+
+@functools.lru_cache(maxsize=1)
+def get_long_text_min_chars() -> int:
+    return int(os.getenv("ANKER_LONG_TEXT_MIN_CHARS", "120"))
+
+
+def is_long_text(input_text: str) -> bool:
+    return long_text.is_long_text(
+        input_text, get_long_text_min_words(), get_long_text_min_chars()
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_long_text_executor() -> concurrent.futures.ThreadPoolExecutor:
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=int(os.getenv("ANKER_LONG_TEXT_WORKERS", "8")),
+        thread_name_prefix="long-text",
+    )
+
+
+# Sentences only need the best translation of a single NMT backend,
+# dictionary lookups would be wasted on them
+LONG_TEXT_BACKENDS = ("mariam", "argos")
+
+
+def translate_sentence(
+    from_language: str, to_language: str, sentence: str
+) -> _t.Optional[str]:
+    for backend in LONG_TEXT_BACKENDS:
+        if not get_backend_route(backend, from_language, to_language):
+            continue
+        translations = translate_backend_route(
+            backend, from_language, to_language, sentence
+        )
+        if translations:
+            return translations[0]
+    return None
+
+
+def iterate_long_text_translation(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Iterator[str]:
+    # Yields the whole translation every time one more sentence is translated
+    return long_text.iterate_translations(
+        # Line breaks separate sentences, so the text is not normalized
+        long_text.split_sentences(input_text.strip()),
+        functools.partial(translate_sentence, from_language, to_language),
+        get_long_text_executor(),
+    )
+
+
+def get_long_text_translation(
+    from_language: str, to_language: str, input_text: str
+) -> str:
+    translations = tuple(
+        iterate_long_text_translation(from_language, to_language, input_text)
+    )
+    return translations[-1] if translations else ""
+
+
+def _get_mariam_translation_result(
+    from_language: str, to_language: str, text: str
+) -> _t.Optional[TranslationResult]:
+    if not get_backend_route("mariam", from_language, to_language):
+        return None
+    return TranslationResult(
+        word=text,
+        from_language=from_language,
+        to_language=to_language,
+        possible_translations=translate_backend_route(
+            "mariam", from_language, to_language, text
+        ),
+        part_of_speech=None,
+    )
+
+
+def _get_argos_translation_result(
+    from_language: str, to_language: str, text: str
+) -> _t.Optional[TranslationResult]:
     argos_translation = get_argostranslate(from_language, to_language)
-    if argos_translation:
-        possible_translations = (
-            argos_translation.translate_function(text) + possible_translations
+    if argos_translation is None:
+        return None
+    return TranslationResult(
+        word=text,
+        from_language=from_language,
+        to_language=to_language,
+        possible_translations=argos_translation.translate_function(text),
+        part_of_speech=None,
+    )
+
+
+BackendFunctionT = _t.Callable[[str, str, str], _t.Optional[TranslationResult]]
+
+
+def _get_backend_functions() -> dict[str, BackendFunctionT]:
+    return {
+        "wordnet": get_wordnet_translation,
+        "dictionary": get_dictionary_translation,
+        "argos": _get_argos_translation_result,
+        "mariam": _get_mariam_translation_result,
+    }
+
+
+def _merge_translation_results(
+    text: str,
+    from_language: str,
+    to_language: str,
+    translation_results: _t.Iterable[_t.Optional[TranslationResult]],
+) -> TranslationResult:
+    existing_results = tuple(filter(None, translation_results))
+    return TranslationResult(
+        word=text,
+        from_language=from_language,
+        to_language=to_language,
+        possible_translations=tuple(
+            itertools.chain.from_iterable(
+                result.possible_translations for result in existing_results
+            )
+        ),
+        part_of_speech=next(
+            (r.part_of_speech for r in existing_results if r.part_of_speech), None
+        ),
+        part_of_speech_translations=tuple(
+            itertools.chain.from_iterable(
+                result.part_of_speech_translations for result in existing_results
+            )
+        ),
+    )
+
+
+def _load_wordnet_language_pair(language_from: str, language_to: str) -> None:
+    init_wordnet_lexicons((language_from, language_to))
+    build_wordnet_index(language_from, language_to)
+    get_wordnet_index(language_from, language_to)
+
+
+def _load_hop(hop: pivot_graph.HopT) -> None:
+    engine, language_from, language_to = hop
+    match engine:
+        case "argos":
+            _install_argos_package(
+                _get_argos_package_mappings()[(language_from, language_to)]
+            )
+            _get_argos_translation(language_from, language_to).load()
+        case "mariam":
+            _get_mariam_model_and_tokenizer(language_from, language_to)
+
+
+def _load_dictionary_language_pair(language_from: str, language_to: str) -> None:
+    build_dictionary(language_from, language_to)
+    get_dictionary(language_from, language_to)
+
+
+def _load_argos_language_pair(language_from: str, language_to: str) -> None:
+    for hop in get_backend_route("argos", language_from, language_to):
+        _load_hop(hop)
+
+
+def _load_mariam_language_pair(language_from: str, language_to: str) -> None:
+    for hop in get_backend_route("mariam", language_from, language_to):
+        _load_hop(hop)
+
+
+def _get_backend_loaders() -> dict[str, _t.Callable[[str, str], None]]:
+    return {
+        "wordnet": _load_wordnet_language_pair,
+        "dictionary": _load_dictionary_language_pair,
+        "argos": _load_argos_language_pair,
+        "mariam": _load_mariam_language_pair,
+    }
+
+
+BackendPairKeyT = tuple[str, str, str]
+
+
+@functools.lru_cache(maxsize=1)
+def get_prefetcher() -> prefetch.Prefetcher[BackendPairKeyT]:
+    return prefetch.Prefetcher(max_workers=len(TRANSLATION_BACKENDS))
+
+
+def prefetch_language_pair(from_language: str, to_language: str) -> None:
+    # Loads resources of every backend for the pair in the background,
+    # does nothing for backends which are already loaded or loading
+    backend_loaders = _get_backend_loaders()
+    for backend in TRANSLATION_BACKENDS:
+        get_prefetcher().prefetch(
+            (backend, from_language, to_language),
+            functools.partial(backend_loaders[backend], from_language, to_language),
         )
 
-    wordnet_translation = get_wordnet_translation(from_language, to_language, text)
 
-    if wordnet_translation is None:
-        return TranslationResult(
-            word=text,
-            from_language=from_language,
-            to_language=to_language,
-            possible_translations=possible_translations,
-            part_of_speech=None,
+def load_language_pair(from_language: str, to_language: str) -> None:
+    # Unlike requests, waits for every backend of the pair to load
+    prefetch_language_pair(from_language, to_language)
+    get_prefetcher().wait_all(
+        (backend, from_language, to_language) for backend in TRANSLATION_BACKENDS
+    )
+
+
+def get_ready_backends(
+    from_language: str,
+    to_language: str,
+    requested_backends: tuple[str, ...] = TRANSLATION_BACKENDS,
+) -> tuple[str, ...]:
+    prefetch_language_pair(from_language, to_language)
+    prefetcher = get_prefetcher()
+    keys = [(backend, from_language, to_language) for backend in requested_backends]
+    if not any(map(prefetcher.is_ready, keys)):
+        # The first request for a pair waits for the fastest backend
+        prefetcher.wait_any(
+            keys,
+            timeout_seconds=max(map(get_backend_deadline_seconds, requested_backends)),
         )
-    else:
-        return dataclasses.replace(
-            wordnet_translation,
-            possible_translations=(
-                wordnet_translation.possible_translations + possible_translations
+    ready_backends = tuple(
+        backend
+        for backend, key in zip(requested_backends, keys)
+        if prefetcher.is_ready(key)
+    )
+    # Still loading backends would load everything they need on their own
+    return ready_backends or requested_backends
+
+
+# Scripts languages are written in, as named by `unicodedata`
+LANGUAGE_SCRIPTS = {"en": "LATIN", "de": "LATIN", "fi": "LATIN"}
+DEFAULT_BACKEND_ROUTES = {
+    backend_router.InputKind.KNOWN_WORD: ("wordnet", "dictionary"),
+    backend_router.InputKind.UNKNOWN_WORD: TRANSLATION_BACKENDS,
+    backend_router.InputKind.KNOWN_PHRASE: TRANSLATION_BACKENDS,
+    backend_router.InputKind.PHRASE: ("argos", "mariam"),
+    backend_router.InputKind.FOREIGN_SCRIPT: TRANSLATION_BACKENDS,
+}
+
+
+def get_default_backend_routes() -> dict[backend_router.InputKind, tuple[str, ...]]:
+    if get_mariam_candidates() == 1:
+        return DEFAULT_BACKEND_ROUTES
+    # Several Marian candidates replace the ones of the other NMT engine
+    return {
+        kind: tuple(backend for backend in route if backend != "argos")
+        for kind, route in DEFAULT_BACKEND_ROUTES.items()
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def get_backend_router() -> _t.Optional[backend_router.BackendRouter]:
+    if os.getenv("ANKER_BACKEND_ROUTER", "1") != "1":
+        return None
+    return backend_router.BackendRouter(
+        {
+            **get_default_backend_routes(),
+            **backend_router.parse_routes(
+                os.getenv("ANKER_BACKEND_ROUTES", ""), TRANSLATION_BACKENDS
             ),
+        }
+    )
+
+
+def get_routing_statistics() -> dict[backend_router.InputKind, int]:
+    router = get_backend_router()
+    if router is None:
+        return {}
+    return router.get_statistics()
+
+
+LookupsT = dict[str, _t.Optional[TranslationResult]]
+
+
+def _is_known_word(
+    from_language: str, to_language: str, lookups: LookupsT, text: str
+) -> bool:
+    # Results of lookups are kept in `lookups` by a backend, so the backends
+    # don't look the text up again. A dictionary lookup takes microseconds,
+    # so it goes first. Resources which are still loading are skipped.
+    if get_prefetcher().is_ready(("dictionary", from_language, to_language)):
+        lookups["dictionary"] = get_dictionary_translation(
+            from_language, to_language, text
         )
+        if lookups["dictionary"] is not None:
+            return True
+    if not get_prefetcher().is_ready(("wordnet", from_language, to_language)):
+        # Lexicons may be still downloading
+        return False
+    lookups["wordnet"] = get_wordnet_translation(from_language, to_language, text)
+    return lookups["wordnet"] is not None
+
+
+def route_backends(
+    from_language: str,
+    to_language: str,
+    text: str,
+    lookups: _t.Optional[LookupsT] = None,
+) -> tuple[str, ...]:
+    router = get_backend_router()
+    if router is None:
+        return TRANSLATION_BACKENDS
+    return router.route(
+        text,
+        LANGUAGE_SCRIPTS.get(from_language),
+        functools.partial(
+            _is_known_word,
+            from_language,
+            to_language,
+            {} if lookups is None else lookups,
+        ),
+    )
+
+
+def _make_cache_key(
+    from_language: str, to_language: str, text: str, backends: tuple[str, ...]
+) -> str:
+    # A result depends on the backends it was routed to and on the number of
+    # Marian candidates
+    return cache.make_key(
+        from_language,
+        to_language,
+        text,
+        (
+            f"{backend}:{get_mariam_candidates()}" if backend == "mariam" else backend
+            for backend in backends
+        ),
+    )
+
+
+def _get_backend_calls(
+    from_language: str,
+    to_language: str,
+    text: str,
+    backends: tuple[str, ...],
+    lookups: LookupsT,
+) -> dict[str, _t.Callable[[], _t.Optional[TranslationResult]]]:
+    backend_functions = _get_backend_functions()
+    return {
+        backend: (
+            functools.partial(lookups.get, backend)
+            if backend in lookups
+            # Backends run in other threads with the priority of the caller
+            else functools.partial(
+                contextvars.copy_context().run,
+                backend_functions[backend],
+                from_language,
+                to_language,
+                text,
+            )
+        )
+        for backend in backends
+    }
+
+
+CACHED_BACKEND = "cache"
+
+
+def _iterate_translations(
+    from_language: str, to_language: str, text: str
+) -> _t.Iterator[tuple[str, _t.Optional[TranslationResult]]]:
+    # Routing goes first, so cached results of other routes are not used
+    lookups: LookupsT = {}
+    routed_backends = route_backends(from_language, to_language, text, lookups)
+    translation_cache = get_translation_cache()
+    key = _make_cache_key(from_language, to_language, text, routed_backends)
+    if translation_cache is not None:
+        if (cached_translation := translation_cache.get(key)) is not None:
+            yield CACHED_BACKEND, TranslationResult.from_json(cached_translation)
+            return
+
+    # Backends of a pair which is still loading are left out of the reply
+    ready_backends = get_ready_backends(from_language, to_language, routed_backends)
+    translation_results: dict[str, _t.Optional[TranslationResult]] = {}
+    for backend, translation_result in get_backend_runner().iterate(
+        _get_backend_calls(from_language, to_language, text, ready_backends, lookups),
+        deadlines={
+            backend: get_backend_deadline_seconds(backend) for backend in ready_backends
+        },
+    ):
+        translation_results[backend] = translation_result
+        yield backend, translation_result
+
+    if len(translation_results) != len(routed_backends):
+        # Partial results are not cached, so a slow backend gets another chance
+        logger.info(
+            msg={
+                "comment": "return a partial translation",
+                "completed_backends": tuple(translation_results),
+            }
+        )
+        return
+    if translation_cache is not None:
+        merged_translation_result = _merge_translation_results(
+            text,
+            from_language,
+            to_language,
+            (translation_results.get(backend) for backend in TRANSLATION_BACKENDS),
+        )
+        translation_cache.put(key, merged_translation_result.to_json())
 
 
 def format_translation_result_iterator(
     translation: TranslationResult,
 ) -> _t.Iterator[str]:
+    # A translation found for several parts of speech is shown with the first one
+    parts_of_speech = {
+        possible_translation: part_of_speech
+        for part_of_speech, possible_translations in reversed(
+            translation.part_of_speech_translations
+        )
+        for possible_translation in possible_translations
+    }
     for possible_translation in translation.possible_translations:
-        if translation.part_of_speech:
-            yield f"({translation.part_of_speech.value}) {possible_translation}"
+        part_of_speech = parts_of_speech.get(
+            possible_translation, translation.part_of_speech
+        )
+        if part_of_speech:
+            yield f"({part_of_speech.value}) {possible_translation}"
         else:
             yield possible_translation
 
 
+def preload_models(languages: tuple[str, ...]) -> None:
+    # Only Marian models are preloaded before worker processes are forked,
+    # CTranslate2 models of Argos are loaded by every process on first use
+    translation_manifest = get_translation_manifest()
+    if translation_manifest is None:
+        init_mariam_translate(languages)
+        return
+    for language_from, language_to in translation_manifest.mariam_models:
+        if {language_from, language_to} <= set(languages):
+            _get_mariam_model_and_tokenizer(language_from, language_to)
+
+
+def _reset_process_local_state():
+    # Threads, thread pools and database connections do not survive a fork,
+    # so a forked process has to create its own ones. Loaded models are kept.
+    get_mariam_batcher.cache_clear()
+    get_argos_batcher.cache_clear()
+    get_backend_runner.cache_clear()
+    get_translation_cache.cache_clear()
+    get_prefetcher.cache_clear()
+    get_governor.cache_clear()
+    get_pivot_flight.cache_clear()
+    get_long_text_executor.cache_clear()
+
+
+os.register_at_fork(after_in_child=_reset_process_local_state)
+
+
+def validate_translation_manifest(
+    translation_manifest: manifest.TranslationManifest,
+) -> None:
+    installed_argos_packages = _get_installed_argos_packages()
+    missing = [
+        f"argos:{language_from}-{language_to}"
+        for language_from, language_to in translation_manifest.argos_packages
+        if (language_from, language_to) not in installed_argos_packages
+    ]
+    missing.extend(
+        f"wordnet:{wordnet_name}"
+        for wordnet_name in translation_manifest.wordnet_lexicons
+        if not _is_wordnet_lexicon_installed(wordnet_name)
+    )
+    missing.extend(
+        f"mariam:{language_from}-{language_to}"
+        for language_from, language_to in translation_manifest.mariam_models
+        if not isinstance(
+            try_to_load_from_cache(
+                f"{MARIAM_MODEL_PREFIX}{language_from}-{language_to}", "config.json"
+            ),
+            str,
+        )
+    )
+    if missing:
+        raise manifest.TranslationManifestException(
+            f"translation packages from the manifest are missing: {missing}"
+        )
+
+
 def initialize_translation_packages():
     langueges = ("en", "de", "fi")
-    init_wordnet_lexicons(languages=langueges)
-    init_argostranslate(languages=langueges)
-    init_mariam_translate(languages=langueges)
+    translation_manifest = get_translation_manifest()
+    if translation_manifest is not None:
+        # Everything was installed at build time, so only check the disk
+        validate_translation_manifest(translation_manifest)
+        return
+    translation_manifest = manifest.TranslationManifest(
+        wordnet_lexicons=init_wordnet_lexicons(languages=langueges),
+        argos_packages=init_argostranslate(languages=langueges),
+        mariam_models=init_mariam_translate(languages=langueges),
+    )
+    build_wordnet_indexes(languages=langueges)
+    build_dictionaries(languages=langueges)
+    for language in langueges:
+        build_spelling_index(language)
+    get_spell_checker.cache_clear()
+    if manifest_path := os.getenv("ANKER_TRANSLATION_MANIFEST_PATH"):
+        manifest.save_manifest(pathlib.Path(manifest_path), translation_manifest)
+        get_translation_manifest.cache_clear()
+
+
+def _get_wordnet_word_frequencies(language: str) -> _t.Iterator[tuple[str, int]]:
+    # Words with more senses tend to be used more often
+    for word in wordnet.words(lang=language):
+        yield word.lemma(), len(word.senses())
+
+
+def get_frequent_words(language: str, count: int) -> tuple[str, ...]:
+    # Words are translated as they are written in WordNet, so they are cached
+    # under the keys of typed words, e.g. German nouns are capitalized
+    return warm_up.get_lexicon_forms(
+        _get_frequent_words(language, count),
+        (word.lemma() for word in wordnet.words(lang=language)),
+    )
+
+
+def _get_frequent_words(language: str, count: int) -> tuple[str, ...]:
+    frequency_lists_dir = os.getenv("ANKER_WARM_UP_FREQUENCY_LISTS_DIR")
+    if frequency_lists_dir:
+        frequency_list_path = pathlib.Path(frequency_lists_dir) / f"{language}.txt"
+        if frequency_list_path.exists():
+            with frequency_list_path.open() as stream:
+                return warm_up.read_frequency_list(stream, count)
+    try:
+        word_frequency = SpellChecker(language=language).word_frequency
+    except ValueError:
+        # pyspellchecker has no dictionary for some languages, e.g. Finnish
+        logger.warning(
+            msg={
+                "comment": "no frequency list for a language, rank wordnet words",
+                "lang": language,
+            }
+        )
+        return warm_up.get_most_frequent(_get_wordnet_word_frequencies(language), count)
+    return warm_up.get_most_frequent(word_frequency.dictionary.items(), count)
+
+
+def get_bulk_translations(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Optional[TranslationResult]:
+    # Waits for governed backends behind interactive requests
+    with governor.use_priority(governor.Priority.BULK):
+        return get_translations(from_language, to_language, input_text)
+
+
+def _warm_up_translation(
+    translation_cache: cache.TranslationCache,
+    from_language: str,
+    to_language: str,
+    input_text: str,
+) -> bool:
+    # Partial results are not cached, so only cached translations count
+    get_bulk_translations(from_language, to_language, input_text)
+    text = _prepare_text(from_language, input_text)
+    backends = route_backends(from_language, to_language, text)
+    return translation_cache.contains(
+        _make_cache_key(from_language, to_language, text, backends)
+    )
+
+
+def warm_translation_cache(words_per_language: int) -> int:
+    # Pre-translates the most frequent words of every language pair, so the
+    # translation cache shipped with the image already has them.
+    translation_cache = get_translation_cache()
+    assert translation_cache is not None, "ANKER_TRANSLATION_CACHE_PATH is not set"
+    languages = get_available_languages()
+    language_pairs = tuple(itertools.permutations(languages, r=2))
+    # Words translated while some backends of a pair are still loading would
+    # get partial results, which are not cached
+    for from_language, to_language in language_pairs:
+        prefetch_language_pair(from_language, to_language)
+    for from_language, to_language in language_pairs:
+        load_language_pair(from_language, to_language)
+    translated = warm_up.warm_up(
+        functools.partial(_warm_up_translation, translation_cache),
+        language_pairs,
+        {
+            language: get_frequent_words(language, words_per_language)
+            for language in languages
+        },
+        workers=int(os.getenv("ANKER_WARM_UP_WORKERS", "16")),
+    )
+    translation_cache.checkpoint()
+    logger.info(
+        msg={
+            "comment": "translation cache is warmed up",
+            "translated": translated,
+            "size_bytes": translation_cache.get_size_bytes(),
+        }
+    )
+    return translated
 
 
 def main():
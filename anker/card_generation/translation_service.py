@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import functools
+import gc
+import logging
+import multiprocessing
+import multiprocessing.pool
+import os
+import typing as _t
+
+from anker.card_generation import cache, single_flight, translation
+
+logger = logging.getLogger(__name__)
+
+
+def _initialize_worker():
+    if translation.get_mariam_engine() is translation.MariamEngine.TORCH:
+        # Threads of the parent process are not forked
+        translation.set_torch_threads.cache_clear()
+        translation.set_torch_threads()
+    logger.info(msg={"comment": "translation worker is started", "pid": os.getpid()})
+
+
+@functools.lru_cache(maxsize=1)
+def get_translation_pool() -> _t.Optional[multiprocessing.pool.Pool]:
+    workers = translation.get_translation_workers()
+    if workers <= 0:
+        return None
+    logger.info(
+        msg={
+            "comment": "load models and fork translation workers",
+            "workers": workers,
+            "mariam_threads": translation.get_governor().get_budget("mariam").threads,
+        }
+    )
+    translation.initialize_translation_packages()
+    translation.preload_models(translation.get_available_languages())
+    # Keep the garbage collector away from objects created before the fork,
+    # otherwise it touches their pages and breaks copy-on-write sharing.
+    gc.freeze()
+    return multiprocessing.get_context("fork").Pool(
+        processes=workers,
+        initializer=_initialize_worker,
+    )
+
+
+def start_translation_workers() -> None:
+    # Must be called before any other threads are started, since the workers
+    # are forked from the calling process.
+    get_translation_pool()
+
+
+def prefetch_language_pair(from_language: str, to_language: str) -> None:
+    pool = get_translation_pool()
+    if pool is None:
+        translation.prefetch_language_pair(from_language, to_language)
+        return
+    # Workers are forked with Marian models only, everything else is loaded
+    # by every worker, so each of them gets a prefetch task. Prefetching
+    # returns at once, so the tasks are spread over idle workers, and a worker
+    # which missed one still prefetches the pair on its first request.
+    for _ in range(translation.get_translation_workers()):
+        pool.apply_async(
+            translation.prefetch_language_pair, (from_language, to_language)
+        )
+
+
+RequestKeyT = tuple[str, str, str]
+TranslationsFlightT = single_flight.SingleFlight[
+    RequestKeyT, _t.Optional[translation.TranslationResult]
+]
+IterateTranslationsFlightT = single_flight.SingleFlight[
+    RequestKeyT, translation.TranslationResult
+]
+
+
+@functools.lru_cache(maxsize=1)
+def get_translations_flight() -> TranslationsFlightT:
+    return single_flight.SingleFlight()
+
+
+@functools.lru_cache(maxsize=1)
+def get_iterate_translations_flight() -> IterateTranslationsFlightT:
+    return single_flight.SingleFlight()
+
+
+def get_single_flight_statistics() -> dict[str, single_flight.SingleFlightStatistics]:
+    return {
+        "get_translations": get_translations_flight().get_statistics(),
+        "iterate_translations": get_iterate_translations_flight().get_statistics(),
+    }
+
+
+def _get_request_key(
+    from_language: str, to_language: str, input_text: str
+) -> RequestKeyT:
+    return from_language, to_language, cache.normalize_text(input_text)
+
+
+def get_translations(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Optional[translation.TranslationResult]:
+    translation.check_input_size(input_text)
+    # Identical concurrent requests wait for the one which is in flight
+    return get_translations_flight().call(
+        _get_request_key(from_language, to_language, input_text),
+        lambda: _get_translations(from_language, to_language, input_text),
+    )
+
+
+def _get_translations(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Optional[translation.TranslationResult]:
+    pool = get_translation_pool()
+    if pool is None:
+        return translation.get_translations(from_language, to_language, input_text)
+    return pool.apply(
+        translation.get_translations, (from_language, to_language, input_text)
+    )
+
+
+def iterate_translations(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Iterator[translation.TranslationResult]:
+    translation.check_input_size(input_text)
+    return get_iterate_translations_flight().iterate(
+        _get_request_key(from_language, to_language, input_text),
+        lambda: _iterate_translations(from_language, to_language, input_text),
+    )
+
+
+def _iterate_translations(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Iterator[translation.TranslationResult]:
+    pool = get_translation_pool()
+    if pool is None:
+        yield from translation.iterate_translations(
+            from_language, to_language, input_text
+        )
+        return
+    # Worker processes return complete results only
+    translation_result = pool.apply(
+        translation.get_translations, (from_language, to_language, input_text)
+    )
+    if translation_result is not None:
+        yield translation_result
+
+
+def iterate_long_text_translation(
+    from_language: str, to_language: str, input_text: str
+) -> _t.Iterator[str]:
+    translation.check_input_size(input_text)
+    pool = get_translation_pool()
+    if pool is None:
+        yield from translation.iterate_long_text_translation(
+            from_language, to_language, input_text
+        )
+        return
+    # Worker processes return complete translations only
+    yield pool.apply(
+        translation.get_long_text_translation, (from_language, to_language, input_text)
+    )
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import operator
+import typing as _t
+
+logger = logging.getLogger(__name__)
+
+# Returns whether the translation was stored
+TranslateFunctionT = _t.Callable[[str, str, str], bool]
+
+
+def read_frequency_list(stream: _t.TextIO, count: int) -> tuple[str, ...]:
+    # Every line is either "word" or "word frequency". Words without a
+    # frequency keep the order of the file, which is expected to be sorted.
+    frequencies: dict[str, int] = {}
+    for line in stream:
+        tokens = line.split()
+        if not tokens:
+            continue
+        frequency = 0
+        if len(tokens) > 1 and tokens[-1].isdigit():
+            frequency = int(tokens.pop())
+        frequencies.setdefault(" ".join(tokens), frequency)
+    words = sorted(frequencies, key=frequencies.__getitem__, reverse=True)
+    return tuple(words[:count])
+
+
+def get_most_frequent(
+    frequencies: _t.Iterable[tuple[str, int]], count: int
+) -> tuple[str, ...]:
+    return tuple(
+        word
+        for word, _ in heapq.nlargest(count, frequencies, key=operator.itemgetter(1))
+    )
+
+
+def get_lexicon_forms(
+    words: _t.Iterable[str], lemmas: _t.Iterable[str]
+) -> tuple[str, ...]:
+    # Frequency lists are usually lowercase, while e.g. German nouns are
+    # capitalized, so words are replaced by every form of them in a lexicon,
+    # e.g. "essen" by "essen" and "Essen". Words missing there are kept.
+    forms: dict[str, list[str]] = {}
+    for lemma in lemmas:
+        forms.setdefault(lemma.lower(), []).append(lemma)
+    return tuple(
+        dict.fromkeys(
+            itertools.chain.from_iterable(
+                forms.get(word.lower(), (word,)) for word in words
+            )
+        )
+    )
+
+
+def warm_up(
+    translate_function: TranslateFunctionT,
+    language_pairs: _t.Iterable[tuple[str, str]],
+    words_by_language: _t.Mapping[str, _t.Sequence[str]],
+    workers: int,
+) -> int:
+    # Words are translated concurrently, so requests for the same language
+    # pair can be batched together by the backends.
+    assert workers > 0, workers
+    translated = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(translate_function, from_language, to_language, word): (
+                from_language,
+                to_language,
+                word,
+            )
+            for from_language, to_language in language_pairs
+            for word in words_by_language.get(from_language, ())
+        }
+        for future in concurrent.futures.as_completed(futures):
+            from_language, to_language, word = futures[future]
+            try:
+                is_stored = future.result()
+            except Exception:
+                logger.exception(
+                    msg={
+                        "comment": "failed to warm up a translation",
+                        "from": from_language,
+                        "to": to_language,
+                        "word": word,
+                    }
+                )
+                continue
+            if not is_stored:
+                logger.warning(
+                    msg={
+                        "comment": "a warmed up translation is not stored",
+                        "from": from_language,
+                        "to": to_language,
+                        "word": word,
+                    }
+                )
+                continue
+            translated += 1
+            if translated % 1000 == 0:
+                logger.info(
+                    msg={
+                        "comment": "warm up translations",
+                        "translated": translated,
+                        "total": len(futures),
+                    }
+                )
+    return translated
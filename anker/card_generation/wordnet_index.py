@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import logging
+import pathlib
+import typing as _t
+
+from anker.card_generation import sorted_table
+
+logger = logging.getLogger(__name__)
+
+# Translations of a lemma grouped by a part of speech, e.g.
+# (("n", ("job", "occupation")), ("v", ("work",)))
+PartOfSpeechTranslationsT = tuple[tuple[str, tuple[str, ...]], ...]
+
+
+class WordNetWord(_t.Protocol):
+    pos: str
+
+    def lemma(self) -> str:
+        ...
+
+    def forms(self) -> _t.Sequence[str]:
+        ...
+
+    def translate(self, lang: str) -> _t.Mapping[_t.Any, _t.Sequence[WordNetWord]]:
+        ...
+
+
+def get_index_key(text: str) -> str:
+    return text.strip().lower()
+
+
+def collect_translations(
+    words: _t.Iterable[WordNetWord], to_language: str
+) -> PartOfSpeechTranslationsT:
+    translations: dict[str, list[str]] = {}
+    for word in words:
+        part_of_speech_translations = translations.setdefault(word.pos, [])
+        for translated_words in word.translate(lang=to_language).values():
+            for translated_word in translated_words:
+                lemma = translated_word.lemma()
+                if lemma not in part_of_speech_translations:
+                    part_of_speech_translations.append(lemma)
+    return tuple(
+        (part_of_speech, tuple(lemmas))
+        for part_of_speech, lemmas in translations.items()
+        if lemmas
+    )
+
+
+def _merge_translations(
+    translations: dict[str, list[str]], new_translations: PartOfSpeechTranslationsT
+):
+    for part_of_speech, lemmas in new_translations:
+        part_of_speech_translations = translations.setdefault(part_of_speech, [])
+        part_of_speech_translations.extend(
+            lemma for lemma in lemmas if lemma not in part_of_speech_translations
+        )
+
+
+def build_index(
+    path: pathlib.Path, words: _t.Iterable[WordNetWord], to_language: str
+) -> int:
+    translations_by_form: dict[str, dict[str, list[str]]] = {}
+    for word in words:
+        word_translations = collect_translations((word,), to_language)
+        if not word_translations:
+            continue
+        for form in {get_index_key(form) for form in (word.lemma(), *word.forms())}:
+            _merge_translations(
+                translations_by_form.setdefault(form, {}), word_translations
+            )
+    logger.info(
+        msg={
+            "comment": "build wordnet index",
+            "path": str(path),
+            "forms": len(translations_by_form),
+        }
+    )
+    return sorted_table.write_table(
+        path,
+        (
+            (form, json.dumps(list(translations.items()), ensure_ascii=False).encode())
+            for form, translations in translations_by_form.items()
+        ),
+    )
+
+
+class WordNetIndex:
+    def __init__(self, path: pathlib.Path):
+        self._table = sorted_table.SortedTable(path)
+
+    def lookup(self, text: str) -> PartOfSpeechTranslationsT:
+        raw_translations = self._table.get(get_index_key(text))
+        if raw_translations is None:
+            return ()
+        return tuple(
+            (part_of_speech, tuple(lemmas))
+            for part_of_speech, lemmas in json.loads(raw_translations)
+        )
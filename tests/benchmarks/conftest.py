@@ -0,0 +1,71 @@
+import dataclasses
+import json
+import os
+import pathlib
+import typing as _t
+
+import pytest
+
+from tests.benchmarks.measurements import BenchmarkResult, find_regressions
+
+# Benchmarks need installed translation models and take minutes, so they only
+# run on demand:
+#   ANKER_RUN_BENCHMARKS=1 HF_HUB_OFFLINE=1 pytest tests/benchmarks
+# Results are written to ANKER_BENCHMARK_OUTPUT and compared with a previous
+# output passed as ANKER_BENCHMARK_BASELINE.
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]):
+    if os.getenv("ANKER_RUN_BENCHMARKS") == "1":
+        return
+    skip_benchmark = pytest.mark.skip(reason="set ANKER_RUN_BENCHMARKS=1 to run")
+    benchmarks_dir = pathlib.Path(__file__).parent
+    for item in items:
+        if benchmarks_dir in item.path.parents and item.name.startswith(
+            "test_benchmark"
+        ):
+            item.add_marker(skip_benchmark)
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline() -> dict[str, dict[str, _t.Any]]:
+    baseline_path = os.getenv("ANKER_BENCHMARK_BASELINE")
+    if not baseline_path:
+        return {}
+    return {
+        result["name"]: result
+        for result in json.loads(pathlib.Path(baseline_path).read_text())
+    }
+
+
+@pytest.fixture(scope="session")
+def benchmark_results() -> _t.Iterator[list[BenchmarkResult]]:
+    results: list[BenchmarkResult] = []
+    yield results
+    if results:
+        output_path = pathlib.Path(
+            os.getenv("ANKER_BENCHMARK_OUTPUT", "bench_output.json")
+        )
+        output_path.write_text(
+            json.dumps([dataclasses.asdict(result) for result in results], indent=2)
+        )
+
+
+@pytest.fixture
+def record_benchmark(
+    benchmark_results: list[BenchmarkResult],
+    benchmark_baseline: dict[str, dict[str, _t.Any]],
+) -> _t.Callable[[BenchmarkResult], None]:
+    tolerance = float(os.getenv("ANKER_BENCHMARK_TOLERANCE", "0.2"))
+
+    def _record(result: BenchmarkResult):
+        benchmark_results.append(result)
+        if result.name not in benchmark_baseline:
+            return
+        regressions = find_regressions(
+            result, benchmark_baseline[result.name], tolerance
+        )
+        if regressions:
+            pytest.fail("\n".join(regressions))
+
+    return _record
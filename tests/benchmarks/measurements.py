@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import math
+import multiprocessing
+import resource
+import time
+import typing as _t
+
+ResultT = _t.TypeVar("ResultT")
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    samples: int
+    cold_load_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    p99_seconds: float
+    throughput_per_second: float
+    # growth of the peak resident size over the process before the cold load
+    peak_rss_growth_bytes: int
+
+
+def get_percentile(values: _t.Sequence[float], percentile: float) -> float:
+    assert len(values) > 0
+    assert 0 < percentile <= 100, percentile
+    sorted_values = sorted(values)
+    rank = math.ceil(percentile / 100 * len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+def get_peak_rss_bytes() -> int:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_isolated(function: _t.Callable[..., ResultT], *args: _t.Any) -> ResultT:
+    # Runs a benchmark in a fresh interpreter, so models loaded and memory
+    # used by the previous benchmarks don't affect its cold load and peak RSS
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return executor.submit(function, *args).result()
+
+
+def measure(
+    name: str,
+    cold_load: _t.Callable[[], _t.Any],
+    function: _t.Callable[[str], _t.Any],
+    corpus: _t.Sequence[str],
+    reset: _t.Callable[[], _t.Any] = lambda: None,
+) -> BenchmarkResult:
+    # `reset` runs before every sample outside of the measured time, e.g. to
+    # clear caches, so repeated texts are translated again
+    initial_peak_rss_bytes = get_peak_rss_bytes()
+    started_at = time.perf_counter()
+    cold_load()
+    cold_load_seconds = time.perf_counter() - started_at
+
+    latencies = []
+    for text in corpus:
+        reset()
+        started_at = time.perf_counter()
+        function(text)
+        latencies.append(time.perf_counter() - started_at)
+    total_seconds = sum(latencies)
+
+    return BenchmarkResult(
+        name=name,
+        samples=len(latencies),
+        cold_load_seconds=cold_load_seconds,
+        p50_seconds=get_percentile(latencies, 50),
+        p95_seconds=get_percentile(latencies, 95),
+        p99_seconds=get_percentile(latencies, 99),
+        throughput_per_second=len(latencies) / total_seconds,
+        peak_rss_growth_bytes=get_peak_rss_bytes() - initial_peak_rss_bytes,
+    )
+
+
+def find_regressions(
+    result: BenchmarkResult, baseline: _t.Mapping[str, _t.Any], tolerance: float
+) -> list[str]:
+    regressions = []
+    for field_name in ("p50_seconds", "p95_seconds", "p99_seconds"):
+        expected = baseline[field_name] * (1 + tolerance)
+        if getattr(result, field_name) > expected:
+            regressions.append(
+                f"{result.name}: {field_name} {getattr(result, field_name):.4f} > "
+                f"{expected:.4f}"
+            )
+    expected_throughput = baseline["throughput_per_second"] * (1 - tolerance)
+    if result.throughput_per_second < expected_throughput:
+        regressions.append(
+            f"{result.name}: throughput_per_second "
+            f"{result.throughput_per_second:.2f} < {expected_throughput:.2f}"
+        )
+    return regressions
@@ -0,0 +1,38 @@
+from tests.benchmarks.measurements import (
+    BenchmarkResult,
+    find_regressions,
+    get_percentile,
+)
+
+
+def _make_result(p50_seconds: float, throughput_per_second: float) -> BenchmarkResult:
+    return BenchmarkResult(
+        name="mariam:en-de:words",
+        samples=10,
+        cold_load_seconds=1.0,
+        p50_seconds=p50_seconds,
+        p95_seconds=0.2,
+        p99_seconds=0.3,
+        throughput_per_second=throughput_per_second,
+        peak_rss_growth_bytes=1,
+    )
+
+
+def test_get_percentile():
+    values = [0.5, 0.1, 0.4, 0.2, 0.3]
+    assert get_percentile(values, 50) == 0.3
+    assert get_percentile(values, 99) == 0.5
+    assert get_percentile(values, 20) == 0.1
+
+
+def test_find_regressions():
+    baseline = {
+        "p50_seconds": 0.1,
+        "p95_seconds": 0.2,
+        "p99_seconds": 0.3,
+        "throughput_per_second": 10.0,
+    }
+    assert find_regressions(_make_result(0.11, 9.0), baseline, 0.2) == []
+    regressions = find_regressions(_make_result(0.2, 5.0), baseline, 0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("mariam:en-de:words: p50_seconds")
@@ -0,0 +1,153 @@
+import itertools
+import logging
+import typing as _t
+
+import pytest
+
+from tests.benchmarks.measurements import BenchmarkResult, measure, run_isolated
+
+CorpusT = dict[str, tuple[str, ...]]
+
+WORD_CORPORA: CorpusT = {
+    "en": ("house", "job", "run", "beautiful", "quickly", "tree", "to learn", "car"),
+    "de": ("Haus", "Beruf", "laufen", "schön", "schnell", "Baum", "lernen", "Auto"),
+    "fi": ("talo", "ammatti", "juosta", "kaunis", "nopeasti", "puu", "oppia", "auto"),
+}
+SENTENCE_CORPORA: CorpusT = {
+    "en": (
+        "I would like to order a cup of coffee.",
+        "The train to the city leaves in ten minutes.",
+        "She has been learning languages for many years.",
+        "Could you please tell me where the library is?",
+    ),
+    "de": (
+        "Ich möchte eine Tasse Kaffee bestellen.",
+        "Der Zug in die Stadt fährt in zehn Minuten ab.",
+        "Sie lernt seit vielen Jahren Sprachen.",
+        "Können Sie mir bitte sagen, wo die Bibliothek ist?",
+    ),
+    "fi": (
+        "Haluaisin tilata kupin kahvia.",
+        "Juna kaupunkiin lähtee kymmenen minuutin kuluttua.",
+        "Hän on opiskellut kieliä monta vuotta.",
+        "Voisitteko kertoa, missä kirjasto on?",
+    ),
+}
+CORPORA: dict[str, CorpusT] = {"words": WORD_CORPORA, "sentences": SENTENCE_CORPORA}
+BACKENDS = ("mariam", "argos", "wordnet", "dictionary", "combined")
+# Every corpus is translated several times to get stable percentiles
+REPETITIONS = 5
+
+
+def _get_language_pairs() -> tuple[tuple[str, str], ...]:
+    return tuple(itertools.permutations(WORD_CORPORA, r=2))
+
+
+BenchmarkFunctionsT = tuple[_t.Callable[[], _t.Any], _t.Callable[[str], _t.Any]]
+
+
+def _clear_translation_caches():
+    from anker.card_generation import translation
+
+    translation.get_mariam_translation.cache_clear()
+    translation.get_pivot_text.cache_clear()
+
+
+def _get_backend_functions(
+    backend: str, from_language: str, to_language: str
+) -> _t.Optional[BenchmarkFunctionsT]:
+    # Models are loaded through the registry, so the measured calls use them
+    from anker.card_generation import translation
+
+    match backend:
+        case "mariam" | "argos":
+            if not translation.get_backend_route(backend, from_language, to_language):
+                return None
+            return (
+                lambda: translation._get_backend_loaders()[backend](
+                    from_language, to_language
+                ),
+                lambda text: translation.translate_backend_route(
+                    backend, from_language, to_language, text
+                ),
+            )
+        case "wordnet":
+            return (
+                lambda: translation._load_wordnet_language_pair(
+                    from_language, to_language
+                ),
+                lambda text: translation.get_wordnet_translation(
+                    from_language, to_language, text
+                ),
+            )
+        case "dictionary":
+            path = translation._get_dictionary_path(from_language, to_language)
+            if path is None or not path.exists():
+                return None
+            return (
+                lambda: translation.get_dictionary(from_language, to_language),
+                lambda text: translation.get_dictionary_translation(
+                    from_language, to_language, text
+                ),
+            )
+        case _:
+            return (
+                lambda: translation.load_language_pair(from_language, to_language),
+                lambda text: translation.get_translations(
+                    from_language, to_language, text
+                ),
+            )
+
+
+def _run_benchmark(
+    backend: str, from_language: str, to_language: str, corpus_name: str
+) -> _t.Optional[BenchmarkResult]:
+    # Runs in a separate process, returns nothing when the backend doesn't
+    # support the language pair
+    logging.basicConfig(level=logging.WARNING)
+    functions = _get_backend_functions(backend, from_language, to_language)
+    if functions is None:
+        return None
+    cold_load, function = functions
+    return measure(
+        f"{backend}:{from_language}-{to_language}:{corpus_name}",
+        cold_load,
+        function,
+        CORPORA[corpus_name][from_language] * REPETITIONS,
+        # Repeated texts are translated again instead of being taken from
+        # in-memory caches
+        reset=_clear_translation_caches,
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def uncached_translations(monkeypatch_module: pytest.MonkeyPatch):
+    from anker.card_generation import translation
+
+    # Benchmark processes inherit the environment
+    monkeypatch_module.delenv("ANKER_TRANSLATION_CACHE_PATH", raising=False)
+    translation.initialize_translation_packages()
+
+
+@pytest.fixture(scope="module")
+def monkeypatch_module() -> _t.Iterator[pytest.MonkeyPatch]:
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        yield monkeypatch
+
+
+@pytest.mark.parametrize("corpus_name", tuple(CORPORA))
+@pytest.mark.parametrize("from_language,to_language", _get_language_pairs())
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_benchmark_translation(
+    backend: str,
+    from_language: str,
+    to_language: str,
+    corpus_name: str,
+    record_benchmark: _t.Callable[[BenchmarkResult], None],
+):
+    result = run_isolated(
+        _run_benchmark, backend, from_language, to_language, corpus_name
+    )
+    if result is None:
+        pytest.skip(f"no {backend} translation for {from_language}-{to_language}")
+    record_benchmark(result)
@@ -0,0 +1,52 @@
+import pytest
+
+from anker.card_generation.backend_router import (
+    BackendRouter,
+    BackendRouterException,
+    InputKind,
+    classify,
+    get_script,
+    parse_routes,
+)
+
+BACKENDS = ("wordnet", "argos", "mariam")
+DICTIONARY = {"haus", "guten tag"}
+
+
+def test_classify():
+    def is_in_dictionary(text: str) -> bool:
+        return text in DICTIONARY
+
+    assert classify("haus", "LATIN", is_in_dictionary) == InputKind.KNOWN_WORD
+    assert classify("hauz", "LATIN", is_in_dictionary) == InputKind.UNKNOWN_WORD
+    assert classify("guten tag", "LATIN", is_in_dictionary) == InputKind.KNOWN_PHRASE
+    assert classify("das haus", "LATIN", is_in_dictionary) == InputKind.PHRASE
+    assert classify("дом", "LATIN", is_in_dictionary) == InputKind.FOREIGN_SCRIPT
+    assert classify("дом", None, is_in_dictionary) == InputKind.UNKNOWN_WORD
+    assert get_script("42!") is None
+
+
+def test_parse_routes():
+    assert parse_routes("known_word=wordnet; phrase=argos,mariam;", BACKENDS) == {
+        InputKind.KNOWN_WORD: ("wordnet",),
+        InputKind.PHRASE: ("argos", "mariam"),
+    }
+    with pytest.raises(BackendRouterException):
+        parse_routes("word=wordnet", BACKENDS)
+    with pytest.raises(BackendRouterException):
+        parse_routes("phrase=google", BACKENDS)
+
+
+def test_backend_router_counts_decisions():
+    routes: dict[InputKind, tuple[str, ...]] = {kind: BACKENDS for kind in InputKind}
+    routes[InputKind.KNOWN_WORD] = ("wordnet",)
+    router = BackendRouter(routes)
+
+    assert router.route("haus", "LATIN", DICTIONARY.__contains__) == ("wordnet",)
+    assert router.route("haus", "LATIN", DICTIONARY.__contains__) == ("wordnet",)
+    assert router.route("das haus", "LATIN", DICTIONARY.__contains__) == BACKENDS
+
+    statistics = router.get_statistics()
+    assert statistics[InputKind.KNOWN_WORD] == 2
+    assert statistics[InputKind.PHRASE] == 1
+    assert statistics[InputKind.UNKNOWN_WORD] == 0
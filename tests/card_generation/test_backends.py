@@ -0,0 +1,42 @@
+import threading
+
+from anker.card_generation.backends import BackendRunner
+
+
+def _raise_error() -> str:
+    raise RuntimeError("broken backend")
+
+
+def test_backend_runner_returns_partial_results_after_deadline():
+    release_slow_backend = threading.Event()
+    runner = BackendRunner(max_workers=3)
+
+    results = runner.run(
+        {
+            "fast": lambda: "fast result",
+            "slow": lambda: str(release_slow_backend.wait(5)),
+            "broken": _raise_error,
+        },
+        deadlines={"fast": 1.0, "slow": 0.05, "broken": 1.0},
+    )
+    release_slow_backend.set()
+
+    assert results == {"fast": "fast result"}
+    statistics = runner.get_statistics()
+    assert statistics["slow"].timeouts == 1
+    assert statistics["broken"].failures == 1
+    assert statistics["fast"].calls == 1
+    assert statistics["fast"].timeouts == 0
+
+
+def test_backend_runner_yields_results_as_they_complete():
+    release_slow_backend = threading.Event()
+    runner = BackendRunner(max_workers=2)
+
+    iterator = runner.iterate(
+        {"fast": lambda: "fast", "slow": lambda: str(release_slow_backend.wait(5))},
+        deadlines={"fast": 1.0, "slow": 5.0},
+    )
+    assert next(iterator) == ("fast", "fast")
+    release_slow_backend.set()
+    assert next(iterator) == ("slow", "True")
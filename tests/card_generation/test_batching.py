@@ -0,0 +1,71 @@
+import concurrent.futures
+import threading
+
+import pytest
+
+from anker.card_generation.batching import MicroBatcher, map_ordered
+
+
+def test_micro_batcher_groups_concurrent_requests_by_key():
+    calls: list[tuple[str, tuple[str, ...]]] = []
+    calls_lock = threading.Lock()
+
+    def batch_function(key: str, values: tuple[str, ...]) -> tuple[str, ...]:
+        with calls_lock:
+            calls.append((key, values))
+        return tuple(f"{key}:{value}" for value in values)
+
+    batcher: MicroBatcher[str, str, str] = MicroBatcher(
+        batch_function, max_batch_size=4, max_wait_seconds=0.2
+    )
+    requests = [("de", "a"), ("de", "b"), ("fi", "c"), ("de", "d")]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        results = list(pool.map(lambda r: batcher(*r), requests))
+
+    assert results == ["de:a", "de:b", "fi:c", "de:d"]
+    assert ("fi", ("c",)) in calls
+    assert sorted(v for _, values in calls for v in values) == ["a", "b", "c", "d"]
+    assert len(calls) < len(requests)
+
+
+def test_micro_batcher_respects_max_batch_size():
+    batch_sizes: list[int] = []
+
+    def batch_function(key: str, values: tuple[int, ...]) -> tuple[int, ...]:
+        batch_sizes.append(len(values))
+        return values
+
+    batcher: MicroBatcher[str, int, int] = MicroBatcher(
+        batch_function, max_batch_size=2, max_wait_seconds=0.2
+    )
+    futures = [batcher.submit("key", i) for i in range(5)]
+    assert [f.result(timeout=5) for f in futures] == list(range(5))
+    assert max(batch_sizes) <= 2
+
+
+def test_micro_batcher_propagates_exceptions():
+    def batch_function(key: str, values: tuple[int, ...]) -> tuple[int, ...]:
+        raise ValueError("broken model")
+
+    batcher: MicroBatcher[str, int, int] = MicroBatcher(
+        batch_function, max_batch_size=2, max_wait_seconds=0
+    )
+    with pytest.raises(ValueError):
+        batcher("key", 1)
+
+
+def test_map_ordered_reads_values_lazily():
+    read: list[int] = []
+
+    def values():
+        for value in range(10):
+            read.append(value)
+            yield value
+
+    results = map_ordered(
+        lambda value: value * 2, values(), max_workers=2, max_pending=3
+    )
+
+    assert next(results) == 0
+    assert len(read) == 3
+    assert list(results) == [value * 2 for value in range(1, 10)]
@@ -0,0 +1,65 @@
+import io
+import pathlib
+
+from anker.card_generation.cache import TranslationCache, make_key
+
+
+def test_make_key_normalizes_input():
+    assert make_key("DE", "en ", " Beruf\t", ("mariam", "argos")) == make_key(
+        "de", "en", "Beruf", ("argos", "mariam")
+    )
+    assert make_key("de", "en", "Essen", ("argos",)) != make_key(
+        "de", "en", "essen", ("argos",)
+    )
+    assert make_key("de", "en", "Maße", ("argos",)) != make_key(
+        "de", "en", "Masse", ("argos",)
+    )
+    assert make_key("de", "en", "Beruf", ("argos",)) != make_key(
+        "de", "en", "Beruf", ("argos", "mariam")
+    )
+
+
+def test_translation_cache_is_persistent(tmp_path: pathlib.Path):
+    cache_path = tmp_path / "cache.sqlite"
+    TranslationCache(cache_path, max_size_bytes=1024).put("key", "value")
+    assert TranslationCache(cache_path, max_size_bytes=1024).get("key") == "value"
+    assert TranslationCache(cache_path, max_size_bytes=1024).get("other") is None
+    assert TranslationCache(cache_path, max_size_bytes=1024).contains("key")
+    assert not TranslationCache(cache_path, max_size_bytes=1024).contains("other")
+
+
+def test_translation_cache_evicts_least_recently_used(tmp_path: pathlib.Path):
+    # Every entry takes 10 bytes, so two of them are left after an eviction
+    translation_cache = TranslationCache(tmp_path / "cache.sqlite", max_size_bytes=25)
+    translation_cache.put("key1", "value1")
+    translation_cache.put("key2", "value2")
+    assert translation_cache.get("key1") == "value1"
+    translation_cache.put("key3", "value3")
+
+    assert translation_cache.get_size_bytes() == 20
+    assert translation_cache.get("key2") is None
+    assert translation_cache.get("key1") == "value1"
+    assert translation_cache.get("key3") == "value3"
+
+
+def test_translation_cache_keeps_total_size(tmp_path: pathlib.Path):
+    cache_path = tmp_path / "cache.sqlite"
+    translation_cache = TranslationCache(cache_path, max_size_bytes=1024)
+    translation_cache.put("key1", "value1")
+    translation_cache.put("key1", "value12")
+    translation_cache.put("key2", "value2")
+    assert translation_cache.get_size_bytes() == 21
+    assert TranslationCache(cache_path, max_size_bytes=1024).get_size_bytes() == 21
+
+
+def test_translation_cache_export_and_import(tmp_path: pathlib.Path):
+    source_cache = TranslationCache(tmp_path / "source.sqlite", max_size_bytes=1024)
+    source_cache.put("key1", "value1")
+    source_cache.put("key2", "value2")
+    exported = io.StringIO()
+    assert source_cache.export_entries(exported) == 2
+
+    target_cache = TranslationCache(tmp_path / "target.sqlite", max_size_bytes=1024)
+    assert target_cache.import_entries(io.StringIO(exported.getvalue())) == 2
+    assert target_cache.get("key1") == "value1"
+    assert target_cache.get("key2") == "value2"
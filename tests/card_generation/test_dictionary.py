@@ -0,0 +1,70 @@
+import io
+import pathlib
+
+import pytest
+
+from anker.card_generation.dictionary import (
+    BilingualDictionary,
+    DictionaryEntry,
+    DictionaryException,
+    build_dictionary,
+    get_part_of_speech,
+    read_source,
+    read_tsv,
+    read_xdxf,
+)
+
+XDXF = """<?xml version="1.0" encoding="UTF-8"?>
+<xdxf lang_from="DEU" lang_to="ENG" format="visual">
+<ar><k>Haus</k> <gr>n.</gr>
+1. house
+2. home; household</ar>
+<ar><k>Hausaufgabe</k><def><deftext><dtrn>homework</dtrn></deftext></def></ar>
+<ar><k>laufen</k><k>lief</k><def><gr><abbr>v</abbr></gr>
+<deftext><dtrn>run</dtrn></deftext><deftext><dtrn>walk</dtrn></deftext></def></ar>
+</xdxf>
+"""
+
+
+def test_read_tsv():
+    lines = ["# comment\n", "Haus\thouse; home\tnoun\n", "\n", "Haus\thousehold\n"]
+
+    assert list(read_tsv(lines)) == [
+        DictionaryEntry("Haus", "n", ("house", "home")),
+        DictionaryEntry("Haus", "", ("household",)),
+    ]
+    with pytest.raises(DictionaryException):
+        list(read_tsv(["Haus\n"]))
+
+
+def test_get_part_of_speech():
+    assert get_part_of_speech(" Subst. ") == "n"
+    assert get_part_of_speech("adj") == "a"
+    # "s" is a satellite adjective in WordNet, but a noun in some dictionaries
+    assert get_part_of_speech("s") == ""
+
+
+def test_read_xdxf():
+    assert list(read_xdxf(io.BytesIO(XDXF.encode()))) == [
+        DictionaryEntry("Haus", "n", ("house", "home", "household")),
+        DictionaryEntry("Hausaufgabe", "", ("homework",)),
+        DictionaryEntry("laufen", "v", ("run", "walk")),
+        DictionaryEntry("lief", "v", ("run", "walk")),
+    ]
+
+
+def test_bilingual_dictionary_lookup_and_prefix(tmp_path: pathlib.Path):
+    source_path = tmp_path / "de-en.xdxf"
+    source_path.write_text(XDXF)
+    dictionary_path = tmp_path / "dictionary-de-en.idx"
+    entries = [*read_source(source_path), DictionaryEntry("haus", "n", ("house",))]
+
+    assert build_dictionary(dictionary_path, entries) == 4
+    dictionary = BilingualDictionary(dictionary_path)
+    assert len(dictionary) == 4
+    assert dictionary.lookup(" HAUS ") == (("n", ("house", "home", "household")),)
+    assert dictionary.lookup("Hund") == ()
+    assert dictionary.complete("hau", limit=5) == ("haus", "hausaufgabe")
+    assert dictionary.complete("hau", limit=1) == ("haus",)
+    with pytest.raises(DictionaryException):
+        list(read_source(tmp_path / "de-en.csv"))
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from anker.card_generation.governor import (
+    BackendBudget,
+    Governor,
+    Priority,
+    get_priority,
+    use_priority,
+)
+
+
+def _wait_for_queue_depth(governor: Governor, depths: dict[Priority, int]):
+    while governor.get_queue_depths()["mariam"] != depths:
+        time.sleep(0.001)
+
+
+def test_governor_serves_interactive_calls_before_bulk_ones():
+    governor = Governor({"mariam": BackendBudget(threads=2, concurrency=1)})
+    order: list[str] = []
+    release = threading.Event()
+
+    def call(name: str, priority: Priority):
+        with governor.acquire("mariam", priority):
+            order.append(name)
+            if name == "first":
+                release.wait()
+
+    threads = [threading.Thread(target=call, args=("first", Priority.BULK))]
+    threads[0].start()
+    while not order:
+        time.sleep(0.001)
+    for name, priority in (("bulk", Priority.BULK), ("lookup", Priority.INTERACTIVE)):
+        threads.append(threading.Thread(target=call, args=(name, priority)))
+        threads[-1].start()
+    _wait_for_queue_depth(governor, {Priority.INTERACTIVE: 1, Priority.BULK: 1})
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert order == ["first", "lookup", "bulk"]
+    assert governor.get_budget("mariam").threads == 2
+
+
+def test_ungoverned_backends_and_priority_context():
+    governor = Governor({})
+    with governor.acquire("wordnet"):
+        pass
+    assert get_priority() == Priority.INTERACTIVE
+    with use_priority(Priority.BULK):
+        assert get_priority() == Priority.BULK
+    assert get_priority() == Priority.INTERACTIVE
@@ -0,0 +1,54 @@
+import concurrent.futures
+import threading
+
+from anker.card_generation.long_text import (
+    PENDING_PLACEHOLDER,
+    LongTextTranslation,
+    Segment,
+    is_long_text,
+    iterate_translations,
+    split_sentences,
+)
+
+
+def test_split_sentences():
+    assert split_sentences("Guten Tag! Wie geht's?\nGut.") == (
+        Segment("Guten Tag!", " "),
+        Segment("Wie geht's?", "\n"),
+        Segment("Gut.", ""),
+    )
+    assert split_sentences("Haus") == (Segment("Haus", ""),)
+    assert split_sentences("3.14 ist eine Zahl") == (Segment("3.14 ist eine Zahl", ""),)
+    assert not is_long_text("das Haus", min_words=20, min_chars=120)
+    assert not is_long_text("Wie geht es? Gut.", min_words=20, min_chars=120)
+    assert not is_long_text("z.B. Haus", min_words=20, min_chars=120)
+    assert is_long_text("ein zwei drei", min_words=3, min_chars=120)
+    assert is_long_text("Donaudampfschifffahrt", min_words=20, min_chars=20)
+
+
+def test_long_text_translation_renders_pending_segments():
+    translation = LongTextTranslation(split_sentences("Ja. Nein.\nVielleicht"))
+
+    assert translation.get_pending() == (0, 1, 2)
+    translation.set(1, "No.")
+    translation.set(2, None)
+    assert translation.render() == f"{PENDING_PLACEHOLDER} No.\nVielleicht"
+
+
+def test_iterate_translations_runs_segments_concurrently():
+    segments = split_sentences("eins. zwei. drei.")
+    barrier = threading.Barrier(len(segments), timeout=5)
+
+    def translate(text: str) -> str:
+        # Every segment waits for the others, so they have to run concurrently
+        barrier.wait()
+        if text == "zwei.":
+            raise ValueError(text)
+        return text.upper()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(segments)) as executor:
+        snapshots = list(iterate_translations(segments, translate, executor))
+
+    assert len(snapshots) == len(segments)
+    assert snapshots[0].count(PENDING_PLACEHOLDER) == 2
+    assert snapshots[-1] == "EINS. zwei. DREI."
@@ -0,0 +1,30 @@
+import pathlib
+
+import pytest
+
+from anker.card_generation.manifest import (
+    TranslationManifest,
+    TranslationManifestException,
+    load_manifest,
+    save_manifest,
+)
+
+
+def test_manifest_round_trip(tmp_path: pathlib.Path):
+    manifest_path = tmp_path / "models" / "manifest.json"
+    assert load_manifest(manifest_path) is None
+
+    translation_manifest = TranslationManifest(
+        mariam_models=(("de", "en"), ("en", "de")),
+        argos_packages=(("de", "en"),),
+        wordnet_lexicons=("oewn:2021",),
+    )
+    save_manifest(manifest_path, translation_manifest)
+    assert load_manifest(manifest_path) == translation_manifest
+
+
+def test_invalid_manifest(tmp_path: pathlib.Path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text('{"mariam_models": []}')
+    with pytest.raises(TranslationManifestException):
+        load_manifest(manifest_path)
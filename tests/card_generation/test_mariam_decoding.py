@@ -0,0 +1,96 @@
+import pytest
+
+from anker.card_generation.mariam_decoding import (
+    PROFILES,
+    Hypothesis,
+    choose_profile,
+    get_best_hypotheses,
+    get_length_order,
+    split_hypotheses,
+)
+
+
+@pytest.mark.parametrize(
+    "text,profile_name",
+    (
+        ("Haus", "fast"),
+        ("das große Haus", "fast"),
+        ("das große alte Haus", "balanced"),
+        (" ".join(["Wort"] * 20), "balanced"),
+        (" ".join(["Wort"] * 21), "quality"),
+    ),
+)
+def test_choose_profile_by_number_of_words(text: str, profile_name: str):
+    assert choose_profile(text) == profile_name
+
+
+def test_choose_profile_override():
+    assert choose_profile("Haus", override="quality") == "quality"
+    assert choose_profile(" ".join(["Wort"] * 30), override="fast") == "fast"
+    with pytest.raises(AssertionError):
+        choose_profile("Haus", override="slow")
+
+
+def test_generate_arguments_cap_new_tokens():
+    assert PROFILES["fast"].get_generate_arguments(input_length=2) == {
+        "num_beams": 1,
+        "num_return_sequences": 1,
+        "early_stopping": False,
+        "max_new_tokens": 8,
+    }
+    assert (
+        PROFILES["fast"].get_generate_arguments(input_length=5)["max_new_tokens"] == 10
+    )
+    assert (
+        PROFILES["balanced"].get_generate_arguments(input_length=7)["max_new_tokens"]
+        == 18
+    )
+    assert (
+        PROFILES["quality"].get_generate_arguments(input_length=4)["max_new_tokens"]
+        == 32
+    )
+
+
+def test_generate_arguments_return_every_beam_for_candidates():
+    arguments = PROFILES["fast"].get_generate_arguments(input_length=2, candidates=3)
+    assert arguments["num_beams"] == 3
+    assert arguments["num_return_sequences"] == 3
+    assert arguments["early_stopping"]
+    arguments = PROFILES["quality"].get_generate_arguments(input_length=2, candidates=2)
+    assert arguments["num_beams"] == 6
+    assert arguments["num_return_sequences"] == 6
+
+
+def test_get_best_hypotheses_deduplicates_texts():
+    hypotheses = get_best_hypotheses(
+        ("house", "home", "house", "the house"), (-0.5, -0.7, -0.2, -0.9), 3
+    )
+    assert hypotheses == (
+        Hypothesis("house", -0.2),
+        Hypothesis("home", -0.7),
+        Hypothesis("the house", -0.9),
+    )
+
+
+def test_get_best_hypotheses_orders_by_score_and_limits_candidates():
+    hypotheses = get_best_hypotheses(("a", "b", "c", "d"), (-3.0, -1.0, -4.0, -2.0), 2)
+    assert hypotheses == (Hypothesis("b", -1.0), Hypothesis("d", -2.0))
+
+
+def test_split_hypotheses_restores_the_input_order():
+    texts = ("Das ist ein langer Satz", "Haus", "Guten Tag")
+    order = get_length_order(texts)
+    assert order == [1, 2, 0]
+    # Two sequences per input, in the order the inputs were decoded in
+    decoded = ("house", "home", "good day", "hello", "this is a long sentence", "")
+    scores = (-0.1, -0.3, -0.2, -0.4, -0.5, -0.6)
+
+    results = split_hypotheses(
+        order, decoded, scores, sequences_per_input=2, candidates=1
+    )
+
+    assert results == (
+        (Hypothesis("this is a long sentence", -0.5),),
+        (Hypothesis("house", -0.1),),
+        (Hypothesis("good day", -0.2),),
+    )
@@ -0,0 +1,35 @@
+from anker.card_generation.model_registry import ModelRegistry
+
+
+def test_model_registry_evicts_least_recently_used_models():
+    registry: ModelRegistry[str, str] = ModelRegistry(budget_bytes=10)
+    loads: list[str] = []
+
+    def get(key: str) -> str:
+        def loader() -> str:
+            loads.append(key)
+            return f"model {key}"
+
+        return registry.get(key, loader=loader, size_function=lambda _: 4)
+
+    assert get("de-en") == "model de-en"
+    get("en-de")
+    get("de-en")
+    get("fi-en")
+    get("de-en")
+    get("en-de")
+
+    assert loads == ["de-en", "en-de", "fi-en", "en-de"]
+    usage = registry.get_usage()
+    assert usage["de-en"].hits == 2
+    assert usage["de-en"].is_loaded
+    assert usage["en-de"].loads == 2
+    assert usage["en-de"].evictions == 1
+    assert not usage["fi-en"].is_loaded
+    assert usage["fi-en"].resident_bytes == 4
+
+
+def test_model_registry_keeps_a_model_bigger_than_the_budget():
+    registry: ModelRegistry[str, str] = ModelRegistry(budget_bytes=1)
+    registry.get("de-en", loader=lambda: "model", size_function=lambda _: 100)
+    assert registry.get_usage()["de-en"].is_loaded
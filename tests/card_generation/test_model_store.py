@@ -0,0 +1,28 @@
+import pathlib
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from anker.card_generation.model_store import load_tensors, save_tensors  # noqa: E402
+
+
+def test_tensors_are_loaded_from_a_memory_mapped_file(tmp_path: pathlib.Path):
+    tensors = {
+        "weight": torch.arange(12, dtype=torch.float32).view(3, 4),
+        "bias": torch.tensor([1, 2, 3], dtype=torch.int8),
+        "scale": torch.tensor(0.5, dtype=torch.float64),
+        "empty": torch.empty((0, 2), dtype=torch.float16),
+    }
+    tensors_path = tmp_path / "model.safetensors"
+    save_tensors(tensors_path, tensors)
+
+    loaded_tensors = load_tensors(tensors_path)
+    assert loaded_tensors.keys() == tensors.keys()
+    for name, tensor in tensors.items():
+        assert loaded_tensors[name].dtype == tensor.dtype
+        assert torch.equal(loaded_tensors[name], tensor)
+
+    # Writes go to private pages and never reach the file
+    loaded_tensors["weight"].add_(1)
+    assert torch.equal(load_tensors(tensors_path)["weight"], tensors["weight"])
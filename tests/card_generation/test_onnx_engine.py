@@ -0,0 +1,69 @@
+import pathlib
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("optimum.onnxruntime")
+torch = pytest.importorskip("torch")
+huggingface_hub = pytest.importorskip("huggingface_hub")
+transformers = pytest.importorskip("transformers")
+
+from anker.card_generation import onnx_engine  # noqa: E402
+
+MODEL_NAME = "Helsinki-NLP/opus-mt-de-en"
+TEXTS = (
+    "Hund",
+    "Guten Morgen",
+    "Ich habe heute keine Zeit, weil ich arbeiten muss.",
+    "Das Wetter ist schön und wir gehen in den Park.",
+)
+
+
+@pytest.fixture(scope="module")
+def exported_model_dir(tmp_path_factory: pytest.TempPathFactory) -> pathlib.Path:
+    if not isinstance(
+        huggingface_hub.try_to_load_from_cache(MODEL_NAME, "config.json"), str
+    ):
+        pytest.skip(f"{MODEL_NAME} is not downloaded")
+    model_dir = tmp_path_factory.mktemp("onnx") / "opus-mt-de-en"
+    onnx_engine.export_model(MODEL_NAME, model_dir, local_files_only=True)
+    return model_dir
+
+
+@pytest.mark.parametrize("num_beams", (1, 4))
+def test_onnx_engine_matches_torch(exported_model_dir: pathlib.Path, num_beams: int):
+    assert onnx_engine.is_model_exported(exported_model_dir)
+    tokenizer = transformers.MarianTokenizer.from_pretrained(exported_model_dir)
+    model = transformers.MarianMTModel.from_pretrained(
+        MODEL_NAME, local_files_only=True
+    )
+    engine = onnx_engine.OnnxMarianEngine(exported_model_dir, threads=1)
+    num_return_sequences = num_beams
+    max_new_tokens = 32
+
+    with torch.inference_mode():
+        expected = model.generate(
+            **tokenizer(TEXTS, return_tensors="pt", padding=True),
+            num_beams=num_beams,
+            num_return_sequences=num_return_sequences,
+            early_stopping=num_beams > 1,
+            max_new_tokens=max_new_tokens,
+        )
+    inputs = tokenizer(TEXTS, return_tensors="np", padding=True)
+    actual = engine.generate(
+        inputs["input_ids"],
+        inputs["attention_mask"],
+        max_new_tokens=max_new_tokens,
+        num_beams=num_beams,
+        num_return_sequences=num_return_sequences,
+    )
+
+    expected_texts = tokenizer.batch_decode(expected, skip_special_tokens=True)
+    actual_texts = tokenizer.batch_decode(actual.sequences, skip_special_tokens=True)
+    if num_beams == 1:
+        assert actual_texts == expected_texts
+    else:
+        # Hypotheses with almost equal scores may swap places
+        assert actual_texts[::num_beams] == expected_texts[::num_beams]
+    assert actual.sequences_scores.shape == (len(TEXTS) * num_beams,)
+    assert (actual.sequences_scores <= 0).all()
@@ -0,0 +1,72 @@
+from anker.card_generation.pivot_graph import PivotGraph
+
+HOPS = (
+    ("argos", "de", "en"),
+    ("argos", "en", "fi"),
+    ("argos", "de", "fi"),
+    ("mariam", "de", "en"),
+    ("mariam", "en", "fi"),
+    ("mariam", "fi", "en"),
+)
+
+
+def test_find_route_prefers_direct_hops():
+    graph = PivotGraph(HOPS, default_latency_seconds=0.1, max_hops=2)
+
+    assert graph.find_route("de", "fi") == (("argos", "de", "fi"),)
+    assert graph.find_route("de", "fi", engines=("mariam",)) == (
+        ("mariam", "de", "en"),
+        ("mariam", "en", "fi"),
+    )
+    assert graph.find_route("fi", "de") == ()
+    assert PivotGraph(HOPS, 0.1, max_hops=1).find_route("de", "fi", ("mariam",)) == ()
+
+
+def test_find_route_follows_measured_latencies():
+    graph = PivotGraph(HOPS, default_latency_seconds=0.1, max_hops=2, smoothing=0.5)
+    graph.record_latency(("argos", "de", "fi"), 1.0)
+    graph.record_latency(("argos", "de", "en"), 0.01)
+    graph.record_latency(("argos", "en", "fi"), 0.2)
+    graph.record_latency(("mariam", "de", "en"), 0.5)
+    graph.record_latency(("mariam", "en", "fi"), 0.3)
+
+    assert graph.find_route("de", "fi") == (
+        ("argos", "de", "en"),
+        ("argos", "en", "fi"),
+    )
+    # Pivot hops may use another engine than the last one
+    assert graph.find_route("de", "fi", last_engine="mariam") == (
+        ("argos", "de", "en"),
+        ("mariam", "en", "fi"),
+    )
+    graph.record_latency(("argos", "de", "fi"), 0.0)
+    assert graph.get_latencies()[("argos", "de", "fi")] == 0.5
+
+
+def test_find_route_does_not_undercut_measured_hops():
+    hops = (("mariam", "de", "fi"), ("mariam", "de", "en"), ("mariam", "en", "fi"))
+    graph = PivotGraph(hops, default_latency_seconds=0.1, max_hops=2)
+    graph.record_latency(("mariam", "de", "fi"), 0.25)
+
+    # Unmeasured pivot hops are as slow as the slowest measured one
+    assert graph.find_route("de", "fi") == (("mariam", "de", "fi"),)
+
+    # Every hop costs a penalty, so a direct hop wins over pivots which are
+    # as fast in total
+    graph = PivotGraph(
+        hops, default_latency_seconds=0.1, max_hops=2, hop_penalty_seconds=0.01
+    )
+    graph.record_latency(("mariam", "de", "fi"), 0.2)
+    graph.record_latency(("mariam", "de", "en"), 0.1)
+    graph.record_latency(("mariam", "en", "fi"), 0.1)
+    assert graph.find_route("de", "fi") == (("mariam", "de", "fi"),)
+
+
+def test_find_route_does_not_pass_the_target_language():
+    graph = PivotGraph(
+        (("argos", "de", "fi"), ("mariam", "fi", "en"), ("mariam", "en", "fi")),
+        default_latency_seconds=0.1,
+        max_hops=3,
+    )
+
+    assert graph.find_route("de", "fi", last_engine="mariam") == ()
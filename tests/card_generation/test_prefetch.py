@@ -0,0 +1,42 @@
+import threading
+
+from anker.card_generation.prefetch import Prefetcher
+
+
+def test_prefetcher_loads_every_key_once():
+    prefetcher: Prefetcher[str] = Prefetcher(max_workers=2)
+    loaded = []
+    prefetcher.prefetch("mariam", lambda: loaded.append("mariam")).result()
+    prefetcher.prefetch("mariam", lambda: loaded.append("mariam")).result()
+
+    assert loaded == ["mariam"]
+    assert prefetcher.is_ready("mariam")
+    assert not prefetcher.is_ready("argos")
+
+
+def test_prefetcher_waits_for_any_key():
+    prefetcher: Prefetcher[str] = Prefetcher(max_workers=2)
+    release = threading.Event()
+    prefetcher.prefetch("slow", release.wait)
+    assert not prefetcher.wait_any(("slow",), timeout_seconds=0.01)
+    assert not prefetcher.is_ready("slow")
+
+    def fail():
+        raise RuntimeError("no package")
+
+    prefetcher.prefetch("broken", fail)
+    assert prefetcher.wait_any(("slow", "broken"), timeout_seconds=1.0)
+    assert prefetcher.is_ready("broken")
+    release.set()
+
+
+def test_prefetcher_waits_for_all_keys():
+    prefetcher: Prefetcher[str] = Prefetcher(max_workers=2)
+    release = threading.Event()
+    prefetcher.prefetch("slow", lambda: release.wait(timeout=1.0))
+    prefetcher.prefetch("fast", lambda: None)
+    threading.Timer(0.01, release.set).start()
+
+    prefetcher.wait_all(("slow", "fast", "unknown"))
+    assert prefetcher.is_ready("slow")
+    assert prefetcher.is_ready("fast")
@@ -0,0 +1,77 @@
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from anker.card_generation.single_flight import SingleFlight
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    started = threading.Event()
+    release = threading.Event()
+    computations = []
+
+    def translate() -> str:
+        computations.append("haus")
+        started.set()
+        release.wait()
+        return "house"
+
+    flight: SingleFlight[str, str] = SingleFlight()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(flight.call, "haus", translate)
+        started.wait()
+        followers = [pool.submit(flight.call, "haus", translate) for _ in range(2)]
+        while flight.get_statistics().coalesced < 2:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == ["house"] * 3
+    assert computations == ["haus"]
+    statistics = flight.get_statistics()
+    assert (statistics.calls, statistics.coalesced, statistics.in_flight) == (3, 2, 0)
+    # Finished computations are not reused
+    assert flight.call("haus", lambda: "home") == "home"
+
+
+def test_single_flight_shares_streamed_items_and_errors():
+    release = threading.Event()
+
+    def stream():
+        yield "house"
+        release.wait()
+        raise RuntimeError("backend failed")
+
+    flight: SingleFlight[str, str] = SingleFlight()
+    leader = flight.iterate("haus", stream)
+    assert next(leader) == "house"
+    follower = flight.iterate("haus", stream)
+    assert next(follower) == "house"
+    release.set()
+    with pytest.raises(RuntimeError):
+        next(leader)
+    with pytest.raises(RuntimeError):
+        next(follower)
+
+
+def test_single_flight_restarts_abandoned_computations():
+    computations = []
+
+    def stream():
+        computations.append("haus")
+        yield "house"
+        yield "home"
+
+    flight: SingleFlight[str, str] = SingleFlight()
+    leader = flight.iterate("haus", stream)
+    assert next(leader) == "house"
+    follower = flight.iterate("haus", stream)
+    assert next(follower) == "house"
+    # The consumer of the leader stops, e.g. it failed to send a reply
+    leader.close()
+
+    assert list(follower) == ["home"]
+    assert computations == ["haus", "haus"]
+    assert flight.get_statistics().in_flight == 0
@@ -0,0 +1,30 @@
+import pathlib
+
+from anker.card_generation.sorted_table import SortedTable, write_table
+
+
+def test_sorted_table_lookups(tmp_path: pathlib.Path):
+    table_path = tmp_path / "table.idx"
+    items = {"haus": b"house", "hausaufgabe": b"homework", "beruf": b"job", "ä": b"a"}
+    assert write_table(table_path, items.items()) == len(items)
+
+    table = SortedTable(table_path)
+    assert len(table) == len(items)
+    for key, value in items.items():
+        assert table.get(key) == value
+    assert table.get("hau") is None
+    assert table.get("zzz") is None
+    assert list(table.iterate_prefix("haus")) == [
+        ("haus", b"house"),
+        ("hausaufgabe", b"homework"),
+    ]
+    assert list(table.iterate_prefix("x")) == []
+    table.close()
+
+
+def test_empty_sorted_table(tmp_path: pathlib.Path):
+    table_path = tmp_path / "table.idx"
+    write_table(table_path, ())
+    table = SortedTable(table_path)
+    assert table.get("haus") is None
+    assert list(table.iterate_prefix("")) == []
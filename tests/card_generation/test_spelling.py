@@ -0,0 +1,37 @@
+import pathlib
+
+import pytest
+
+from anker.card_generation.spelling import (
+    SymmetricDeleteSpellChecker,
+    build_index,
+    get_edit_distance,
+)
+
+
+@pytest.mark.parametrize(
+    "source,target,distance",
+    (
+        ("beruf", "beruf", 0),
+        ("berf", "beruf", 1),
+        ("bretuf", "beruf", 2),
+        ("ebruf", "beruf", 1),
+        ("", "haus", 4),
+    ),
+)
+def test_get_edit_distance(source: str, target: str, distance: int):
+    assert get_edit_distance(source, target) == distance
+
+
+def test_spell_checker_corrections(tmp_path: pathlib.Path):
+    build_index(
+        tmp_path,
+        {"beruf": 10, "haus": 100, "hausaufgabe": 5, "maus": 10, "haut": 50},
+    )
+    spell_checker = SymmetricDeleteSpellChecker(tmp_path)
+
+    assert spell_checker.correct("Beruf") == "Beruf"
+    assert spell_checker.correct("Berf") == "Beruf"
+    assert spell_checker.correct("hausaufgbe") == "hausaufgabe"
+    assert spell_checker.correct("hauss") == "haus"
+    assert spell_checker.correct("xyzxyz") == "xyzxyz"
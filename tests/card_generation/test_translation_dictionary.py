@@ -0,0 +1,30 @@
+import pathlib
+
+import pytest
+
+pytest.importorskip("argostranslate")
+pytest.importorskip("spellchecker")
+pytest.importorskip("transformers")
+pytest.importorskip("wn")
+
+from anker.card_generation import translation  # noqa: E402
+
+
+def test_get_dictionary_uses_dictionary_built_after_a_miss(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    sources_dir = tmp_path / "sources"
+    sources_dir.mkdir()
+    (sources_dir / "de-en.tsv").write_text("Haus\thouse; home\tnoun\n")
+    monkeypatch.setenv("ANKER_DICTIONARIES_DIR", str(tmp_path))
+    monkeypatch.setenv("ANKER_DICTIONARY_SOURCES_DIR", str(sources_dir))
+
+    assert translation.get_dictionary("de", "en") is None
+    assert translation.get_dictionary_translation("de", "en", "Haus") is None
+
+    translation.build_dictionary("de", "en")
+
+    bilingual_dictionary = translation.get_dictionary("de", "en")
+    assert bilingual_dictionary is not None
+    assert bilingual_dictionary.lookup("Haus") == (("n", ("house", "home")),)
+    assert translation.get_dictionary("de", "en") is bilingual_dictionary
@@ -0,0 +1,60 @@
+import io
+import threading
+
+from anker.card_generation.warm_up import (
+    get_lexicon_forms,
+    get_most_frequent,
+    read_frequency_list,
+    warm_up,
+)
+
+
+def test_read_frequency_list_sorts_by_frequency():
+    stream = io.StringIO("haus 10\n\nberuf 30\nguten tag 20\nhaus 5\n")
+    assert read_frequency_list(stream, 2) == ("beruf", "guten tag")
+    stream = io.StringIO("der\ndie\ndas\n")
+    assert read_frequency_list(stream, 10) == ("der", "die", "das")
+
+
+def test_get_most_frequent():
+    frequencies = (("haus", 10), ("beruf", 30), ("baum", 20))
+    assert get_most_frequent(frequencies, 2) == ("beruf", "baum")
+    assert get_most_frequent(iter(frequencies), 5) == ("beruf", "baum", "haus")
+
+
+def test_get_lexicon_forms():
+    lemmas = ("Haus", "essen", "Essen", "Maße", "Masse")
+    assert get_lexicon_forms(("haus", "essen", "maße", "xyz", "Haus"), lemmas) == (
+        "Haus",
+        "essen",
+        "Essen",
+        "Maße",
+        "xyz",
+    )
+
+
+def test_warm_up_translates_words_for_every_pair():
+    lock = threading.Lock()
+    translated = []
+
+    def translate(from_language: str, to_language: str, word: str) -> bool:
+        if word == "broken":
+            raise RuntimeError(word)
+        with lock:
+            translated.append((from_language, to_language, word))
+        # A partial result is not stored
+        return word != "partial"
+
+    count = warm_up(
+        translate,
+        (("de", "en"), ("en", "de")),
+        {"de": ("haus", "broken", "partial"), "en": ("house",)},
+        workers=2,
+    )
+
+    assert count == 2
+    assert sorted(translated) == [
+        ("de", "en", "haus"),
+        ("de", "en", "partial"),
+        ("en", "de", "house"),
+    ]
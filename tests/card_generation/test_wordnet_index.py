@@ -0,0 +1,44 @@
+import dataclasses
+import pathlib
+import typing as _t
+
+from anker.card_generation.wordnet_index import WordNetIndex, build_index
+
+
+@dataclasses.dataclass
+class FakeWord:
+    pos: str
+    word_lemma: str
+    word_forms: tuple[str, ...] = ()
+    translations: dict[str, tuple["FakeWord", ...]] = dataclasses.field(
+        default_factory=dict
+    )
+
+    def lemma(self) -> str:
+        return self.word_lemma
+
+    def forms(self) -> _t.Sequence[str]:
+        return self.word_forms
+
+    def translate(self, lang: str) -> _t.Mapping[str, _t.Sequence["FakeWord"]]:
+        return self.translations
+
+
+def test_wordnet_index_groups_all_senses_by_part_of_speech(tmp_path: pathlib.Path):
+    words = [
+        FakeWord(
+            "n",
+            "Lauf",
+            ("Läufe",),
+            {"1": (FakeWord("n", "run"),), "2": (FakeWord("n", "course"),)},
+        ),
+        FakeWord("v", "laufen", ("lauf",), {"1": (FakeWord("v", "run"),)}),
+        FakeWord("n", "Haus"),
+    ]
+    index_path = tmp_path / "wordnet-de-en.idx"
+    assert build_index(index_path, words, "en") == 3
+
+    index = WordNetIndex(index_path)
+    assert index.lookup("Lauf") == (("n", ("run", "course")), ("v", ("run",)))
+    assert index.lookup("läufe") == (("n", ("run", "course")),)
+    assert index.lookup("Haus") == ()